@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+SESSION LOG ANALYSIS
+Cohort-wide statistics over answered rounds: accuracy and response times
+per category, the most-missed questions, how long correct streaks run,
+and learning curves (accuracy by question number within a session, and
+by day).
+
+Logs are read one round at a time through generators, from the progress
+database (a SQLite cursor) or from JSONL files with one round per line:
+
+    {"ts": 1760000000.0, "session": "ab12", "question_id": 7,
+     "category": "list_methods", "correct": 1, "response_ms": 5400}
+
+A progress database holds the rounds of every question bank played; only
+the built-in bank's are read, or a pack's with --pack.
+
+Memory depends on the number of categories, questions, days and
+sessions still in progress, never on the length of the logs: a session
+not seen for `max_sessions` other sessions is closed. Several log files
+are analyzed in parallel, one process per file, and the results merged.
+
+Usage:
+    python pcep_analyze.py                        # ~/.pcep_practice.db
+    python pcep_analyze.py logs/*.jsonl --workers 8
+    python pcep_analyze.py --json > report.json
+    python pcep_analyze.py --export rounds.jsonl  # database -> JSONL
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from pcep_metrics import LogHistogram
+from pcep_progress import BUILTIN_BANK, DEFAULT_DB, bank_identity, connect
+from pcep_questions import CATEGORIES
+
+FIELDS = ("ts", "session", "question_id", "category", "correct", "response_ms")
+# Learning curve by question number: buckets of CURVE_STEP, the last open-ended
+CURVE_STEP = 10
+CURVE_BUCKETS = 20
+# Streak lengths reported together
+STREAK_BANDS = ((1, 1), (2, 2), (3, 4), (5, 9), (10, 19), (20, None))
+
+
+def read_sqlite(path, categories=CATEGORIES, bank=BUILTIN_BANK):
+    """One bank's rounds from a progress database, oldest first: (ts, session, qid, category, correct, ms)"""
+    conn = connect(path)
+    try:
+        cursor = conn.execute("SELECT ts, session, question_id, category, correct, response_ms "
+                              "FROM answers WHERE bank = ? ORDER BY id", (bank,))
+        for ts, session, qid, category, correct, response_ms in cursor:
+            name = categories[category] if category < len(categories) else str(category)
+            yield ts, session, qid, name, correct, response_ms
+    finally:
+        conn.close()
+
+
+def read_jsonl(path, categories=CATEGORIES):
+    """Rounds from a JSONL log; lines that aren't a round are skipped"""
+    # raw_decode skips json.loads' per-call checks; a round is one object per line
+    decode = json.JSONDecoder().raw_decode
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                data = decode(line)[0]
+                category = data["category"]
+                if isinstance(category, int):
+                    category = categories[category] if category < len(categories) else str(category)
+                yield (data.get("ts"), data.get("session"), data["question_id"], category,
+                       int(data["correct"]), data.get("response_ms"))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+
+def read_rounds(path, pack=None):
+    """Rounds from a log file, picking the reader by extension (pack: played from that pack)"""
+    categories, bank = CATEGORIES, BUILTIN_BANK
+    if pack:
+        from pcep_packs import PackBank
+        pack_bank = PackBank(pack)
+        categories, bank = pack_bank.categories, bank_identity(pack_bank)
+    if path.endswith(".jsonl"):
+        return read_jsonl(path, categories)
+    return read_sqlite(path, categories, bank)
+
+
+def export_jsonl(rounds, path):
+    """Write rounds as JSONL, streaming; returns the number written"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for values in rounds:
+            f.write(json.dumps(dict(zip(FIELDS, values))) + "\n")
+            count += 1
+    return count
+
+
+def local_day(ts):
+    """("YYYY-MM-DD", start, end) of the local day holding a timestamp.
+
+    The bounds come from mktime(), so days of 23 or 25 hours (DST) and
+    time zones that aren't whole hours from UTC get them right.
+    """
+    year, month, day = time.localtime(ts)[:3]
+    start = time.mktime((year, month, day, 0, 0, 0, 0, 0, -1))
+    end = time.mktime((year, month, day + 1, 0, 0, 0, 0, 0, -1))
+    return f"{year:04d}-{month:02d}-{day:02d}", start, end
+
+
+class Analysis:
+    """Running totals over rounds; feed with add() or consume(), combine with merge()"""
+
+    def __init__(self, max_sessions=10_000):
+        self.max_sessions = max_sessions
+        self.rounds = 0
+        self.categories = {}      # name -> [correct, total]
+        self.response_ms = {}     # category name -> LogHistogram
+        self.questions = {}       # (category, qid) -> [misses, total]
+        self.streaks = Counter()  # finished run length -> count
+        self.curve = [[0, 0] for _ in range(CURVE_BUCKETS)]
+        self.days = {}            # "YYYY-MM-DD" -> [correct, total]
+        # (start, end, name) of the last local day seen: rounds come mostly in time order
+        self.day = (0, 0, None)
+        self.sessions = 0
+        # Sessions in progress: session -> [answered, current streak]
+        self.open = OrderedDict()
+
+    def add(self, ts, session, qid, category, correct, response_ms):
+        """Fold in one answered round"""
+        self.rounds += 1
+        counts = self.categories.get(category)
+        if counts is None:
+            counts = self.categories[category] = [0, 0]
+        counts[0] += correct
+        counts[1] += 1
+        if response_ms is not None:
+            histogram = self.response_ms.get(category)
+            if histogram is None:
+                histogram = self.response_ms[category] = LogHistogram()
+            histogram.record(response_ms)
+        key = (category, qid)
+        counts = self.questions.get(key)
+        if counts is None:
+            counts = self.questions[key] = [0, 0]
+        counts[0] += not correct
+        counts[1] += 1
+        if ts is not None:
+            start, end, day = self.day
+            if not start <= ts < end:
+                day, start, end = local_day(ts)
+                self.day = (start, end, day)
+            counts = self.days.get(day)
+            if counts is None:
+                counts = self.days[day] = [0, 0]
+            counts[0] += correct
+            counts[1] += 1
+
+        progress = self.open.get(session)
+        if progress is None:
+            progress = self.open[session] = [0, 0]
+            self.sessions += 1
+            if len(self.open) > self.max_sessions:
+                self.close_session(self.open.popitem(last=False)[1])
+        else:
+            self.open.move_to_end(session)
+        counts = self.curve[min(progress[0] // CURVE_STEP, CURVE_BUCKETS - 1)]
+        counts[0] += correct
+        counts[1] += 1
+        progress[0] += 1
+        if correct:
+            progress[1] += 1
+        elif progress[1]:
+            self.streaks[progress[1]] += 1
+            progress[1] = 0
+
+    def close_session(self, progress):
+        if progress[1]:
+            self.streaks[progress[1]] += 1
+
+    def consume(self, rounds):
+        """add() every round of an iterable, then close the sessions still open"""
+        add = self.add
+        for values in rounds:
+            add(*values)
+        self.finish()
+        return self
+
+    def finish(self):
+        while self.open:
+            self.close_session(self.open.popitem()[1])
+
+    def merge(self, other):
+        """Add another (finished) analysis, e.g. of a different log file"""
+        self.rounds += other.rounds
+        self.sessions += other.sessions
+        for mine, theirs in ((self.categories, other.categories), (self.questions, other.questions),
+                             (self.days, other.days)):
+            for key, (first, second) in theirs.items():
+                counts = mine.setdefault(key, [0, 0])
+                counts[0] += first
+                counts[1] += second
+        for category, histogram in other.response_ms.items():
+            self.response_ms.setdefault(category, LogHistogram()).merge(histogram)
+        self.streaks.update(other.streaks)
+        for counts, (correct, total) in zip(self.curve, other.curve):
+            counts[0] += correct
+            counts[1] += total
+        return self
+
+    def most_missed(self, limit=10):
+        """[(misses, answers, category, qid)], most misses first"""
+        rows = [(misses, total, category, qid)
+                for (category, qid), (misses, total) in self.questions.items() if misses]
+        rows.sort(key=lambda row: (-row[0], -row[0] / row[1]))
+        return rows[:limit]
+
+    def streak_bands(self):
+        """[(label, runs)] for the STREAK_BANDS"""
+        bands = []
+        for low, high in STREAK_BANDS:
+            runs = sum(count for length, count in self.streaks.items()
+                       if length >= low and (high is None or length <= high))
+            label = str(low) if low == high else f"{low}+" if high is None else f"{low}-{high}"
+            bands.append((label, runs))
+        return bands
+
+    def to_json(self, limit=10):
+        def accuracy(correct, total):
+            return round(100 * correct / total, 1) if total else None
+
+        return {
+            "rounds": self.rounds,
+            "sessions": self.sessions,
+            "categories": {
+                name: {"answered": total, "accuracy": accuracy(correct, total),
+                       "response_ms": (self.response_ms[name].summary()
+                                       if name in self.response_ms else None)}
+                for name, (correct, total) in sorted(self.categories.items())
+            },
+            "most_missed": [{"category": category, "question_id": qid, "misses": misses,
+                             "answered": total}
+                            for misses, total, category, qid in self.most_missed(limit)],
+            "streaks": dict(self.streak_bands()),
+            "curve_by_question_number": [
+                {"from": i * CURVE_STEP + 1, "answered": total, "accuracy": accuracy(correct, total)}
+                for i, (correct, total) in enumerate(self.curve) if total
+            ],
+            "curve_by_day": {day: {"answered": total, "accuracy": accuracy(correct, total)}
+                             for day, (correct, total) in sorted(self.days.items())},
+        }
+
+
+def analyze_path(path, max_sessions=10_000, pack=None):
+    """Analysis of one log file (run in a worker process for several files)"""
+    return Analysis(max_sessions).consume(read_rounds(path, pack))
+
+
+def analyze(paths, workers=None, max_sessions=10_000, pack=None):
+    """One merged Analysis of all the log files, one process per file"""
+    workers = min(len(paths), workers or os.cpu_count() or 1)
+    result = Analysis(max_sessions)
+    if workers == 1:
+        for path in paths:
+            result.merge(analyze_path(path, max_sessions, pack))
+        return result
+    with ProcessPoolExecutor(workers) as pool:
+        for analysis in pool.map(analyze_path, paths, [max_sessions] * len(paths), [pack] * len(paths)):
+            result.merge(analysis)
+    return result
+
+
+def question_text(bank, qid):
+    """First line of a question's text, if the bank has that question"""
+    if bank is None or qid >= len(bank):
+        return ""
+    record = bank.get(qid)
+    text = getattr(record, "question", None) or record.text
+    return text.splitlines()[0]
+
+
+def print_report(analysis, bank=None, limit=10):
+    report = analysis.to_json(limit)
+    print(f"📊 {report['rounds']:,} answers in {report['sessions']:,} sessions")
+
+    print("\n📚 By category:")
+    for name, data in report["categories"].items():
+        timing = data["response_ms"]
+        median = f"   median {timing['p50'] / 1000:.1f}s" if timing else ""
+        print(f"   {name:<20} {data['accuracy']:5.1f}% of {data['answered']:,}{median}")
+
+    print("\n❗ Most missed:")
+    for row in report["most_missed"]:
+        text = question_text(bank, row["question_id"])
+        print(f"   {row['misses']:>6,} / {row['answered']:<6,} {row['category']:<20} {text}")
+
+    print("\n🔥 Correct streaks:")
+    for label, runs in report["streaks"].items():
+        print(f"   {label:>6} in a row: {runs:,}")
+
+    print("\n📈 Accuracy by question number in a session:")
+    for point in report["curve_by_question_number"]:
+        start = point["from"]
+        span = f"{start}+" if start > (CURVE_BUCKETS - 1) * CURVE_STEP else f"{start}-{start + CURVE_STEP - 1}"
+        print(f"   {span:>8}: {point['accuracy']:5.1f}% of {point['answered']:,}")
+
+    print("\n📅 Accuracy by day:")
+    for day, point in report["curve_by_day"].items():
+        print(f"   {day}: {point['accuracy']:5.1f}% of {point['answered']:,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statistics over answered rounds")
+    parser.add_argument("logs", nargs="*", default=[DEFAULT_DB],
+                        help="progress databases or JSONL logs (default: the progress store)")
+    parser.add_argument("--workers", type=int, help="processes for several logs (default: one per core)")
+    parser.add_argument("--top", type=int, default=10, help="most-missed questions to list (default 10)")
+    parser.add_argument("--max-sessions", type=int, default=10_000,
+                        help="sessions kept open at once (default 10000)")
+    parser.add_argument("--pack", help="analyze the rounds played from this question pack")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--export", metavar="JSONL", help="write the logs' rounds to a JSONL file instead")
+    args = parser.parse_args(argv)
+
+    missing = [path for path in args.logs if not os.path.exists(path)]
+    if missing:
+        print(f"No such log: {', '.join(missing)}")
+        return 1
+
+    if args.export:
+        if len(args.logs) != 1:
+            print("--export converts one log at a time")
+            return 1
+        count = export_jsonl(read_rounds(args.logs[0], args.pack), args.export)
+        print(f"Wrote {count:,} rounds to {args.export}")
+        return 0
+
+    analysis = analyze(args.logs, args.workers, args.max_sessions, args.pack)
+    if args.json:
+        json.dump(analysis.to_json(args.top), sys.stdout, indent=2)
+        print()
+        return 0
+    if args.pack:
+        from pcep_packs import PackBank
+        bank = PackBank(args.pack)
+    else:
+        from pcep_questions import QUESTION_BANK as bank
+    print_report(analysis, bank, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
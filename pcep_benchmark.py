@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+PCEP PRACTICE GAME BENCHMARKS
+Times question draws, grading and full rounds, and compares the results
+against a stored baseline so regressions show up early.
+
+Usage:
+    python pcep_benchmark.py                      # run and print
+    python pcep_benchmark.py --output run.json    # also save results
+    python pcep_benchmark.py --update-baseline    # store as the new baseline
+"""
+
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from pcep_metrics import percentile
+from pcep_practive_game import PythonPracticeGame
+
+DEFAULT_BASELINE = "bench_baseline.json"
+
+
+class NullWriter:
+    """A stdout replacement that throws everything away"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+@contextlib.contextmanager
+def stubbed_io(answer="42"):
+    """Silence print() and answer every input() prompt with `answer`"""
+    real_input = builtins.input
+    builtins.input = lambda prompt="": answer
+    try:
+        with contextlib.redirect_stdout(NullWriter()):
+            yield
+    finally:
+        builtins.input = real_input
+
+
+def time_calls(func, samples, batch):
+    """Time `samples` batches of `batch` calls; return per-call ns and ops/sec"""
+    timer = time.perf_counter_ns
+    latencies = []
+    calls = range(batch)
+    start = timer()
+    for _ in range(samples):
+        t0 = timer()
+        for _ in calls:
+            func()
+        latencies.append((timer() - t0) / batch)
+    elapsed = timer() - start
+    latencies.sort()
+    return latencies, samples * batch * 1e9 / elapsed
+
+
+def measure_allocations(func, calls):
+    """Bytes allocated (peak) and retained per call, as seen by tracemalloc"""
+    tracemalloc.start()
+    try:
+        allocated = 0
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            func()
+            allocated += tracemalloc.get_traced_memory()[1] - current
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return allocated / calls, max(retained, 0) / calls
+
+
+def run_benchmark(func, samples, batch, alloc_calls):
+    """Full set of numbers for one benchmark"""
+    func()  # warm up
+    latencies, ops = time_calls(func, samples, batch)
+    allocated, retained = measure_allocations(func, alloc_calls)
+    return {
+        "ops_per_sec": round(ops, 1),
+        "p50_ns": round(percentile(latencies, 0.50), 1),
+        "p99_ns": round(percentile(latencies, 0.99), 1),
+        "alloc_bytes_per_call": round(allocated, 1),
+        "retained_bytes_per_call": round(retained, 1),
+    }
+
+
+def build_benchmarks(game):
+    """Name -> zero-argument callable for everything we time"""
+    benchmarks = {"get_random_question": game.get_random_question}
+    for name, bucket in zip(game.bank.categories, game.bank.by_category):
+        # A pack may leave built-in categories empty or add its own (no method)
+        method = getattr(game, f"{name}_question", None)
+        if method is not None and len(bucket):
+            benchmarks[f"{name}_question"] = method
+    benchmarks["check_answer_correct"] = lambda: game.check_answer(" Int ", "int")
+    benchmarks["check_answer_wrong"] = lambda: game.check_answer("[1,2,3]", "[1, 2, 3, 4]")
+    benchmarks["play_round"] = game.play_round
+    return benchmarks
+
+
+def run_all(quick=False, only=None):
+    """Run every benchmark (or the ones named in `only`) and collect results"""
+    random.seed(0)
+    samples, batch, alloc_calls = (200, 10, 200) if quick else (2000, 20, 2000)
+    game = PythonPracticeGame()
+    results = {}
+    with stubbed_io():
+        for name, func in build_benchmarks(game).items():
+            if only and name not in only:
+                continue
+            if name == "play_round":
+                # Full rounds are much slower; keep the run time reasonable
+                results[name] = run_benchmark(func, samples // 4, max(1, batch // 10), alloc_calls // 4)
+            else:
+                results[name] = run_benchmark(func, samples, batch, alloc_calls)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bank_size": len(game.bank),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return a list of (name, message) regressions against the baseline"""
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if now["ops_per_sec"] < before["ops_per_sec"] * (1 - threshold):
+            change = (now["ops_per_sec"] / before["ops_per_sec"] - 1) * 100
+            regressions.append((name, f"throughput {change:+.1f}%"))
+        if now["alloc_bytes_per_call"] > before["alloc_bytes_per_call"] * (1 + threshold) + 64:
+            regressions.append((name, f"allocations {before['alloc_bytes_per_call']:.0f}B -> "
+                                      f"{now['alloc_bytes_per_call']:.0f}B per call"))
+    return regressions
+
+
+def print_report(report, baseline=None):
+    """Print a results table, with the change vs. baseline when we have one"""
+    print(f"{'benchmark':<28}{'ops/sec':>14}{'p50 ns':>10}{'p99 ns':>10}{'alloc B':>10}{'vs base':>10}")
+    print("-" * 82)
+    for name, r in report["results"].items():
+        delta = ""
+        before = (baseline or {}).get("results", {}).get(name)
+        if before:
+            delta = f"{(r['ops_per_sec'] / before['ops_per_sec'] - 1) * 100:+.1f}%"
+        print(f"{name:<28}{r['ops_per_sec']:>14,.0f}{r['p50_ns']:>10.0f}{r['p99_ns']:>10.0f}"
+              f"{r['alloc_bytes_per_call']:>10.0f}{delta:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PCEP practice game engine")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown / allocation growth before failing (default 0.10)")
+    parser.add_argument("--quick", action="store_true", help="fewer samples, for a fast sanity check")
+    parser.add_argument("only", nargs="*", help="run only these benchmarks")
+    args = parser.parse_args(argv)
+
+    report = run_all(quick=args.quick, only=set(args.only))
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if baseline:
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for name, message in regressions:
+                print(f"  {name}: {message}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
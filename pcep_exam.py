@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+MOCK EXAM GENERATOR
+Printable PCEP mock exam papers with answer sheets, for classroom use.
+
+Paper N is built from a random.Random(N), so the same seed (and question
+bank) always gives the same paper. Questions are dealt from a balanced
+deck (each category in turn, see pcep_sampling.DeckPicker), so every
+topic is equally represented, and no question appears twice in a paper.
+
+Seed ranges are spread over a process pool; each worker writes its papers
+to disk as it makes them, so memory stays flat however many are made.
+
+Usage:
+    python pcep_exam.py --papers 1000 --output exams/
+    python pcep_exam.py --papers 30 --first-seed 500 --format md --length 40
+    python pcep_exam.py --papers 5000 --format json --workers 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pcep_sampling import DeckPicker
+
+FORMATS = ("txt", "md", "json")
+# The real PCEP exam has 30 questions in 40 minutes
+DEFAULT_LENGTH = 30
+
+# Bank of the current worker process, loaded on first use
+_banks = {}
+
+
+def load_bank(pack=None):
+    bank = _banks.get(pack)
+    if bank is None:
+        if pack:
+            from pcep_packs import PackBank
+            bank = PackBank(pack)
+        else:
+            from pcep_questions import QUESTION_BANK as bank
+        _banks[pack] = bank
+    return bank
+
+
+def make_paper(bank, seed, length=DEFAULT_LENGTH):
+    """The questions of paper `seed`: balanced over categories, no repeats, shuffled"""
+    if length > len(bank):
+        raise ValueError(f"a paper of {length} questions needs a bigger bank than {len(bank)}")
+    rng = random.Random(seed)
+    deck = DeckPicker(bank, stratified=True, rng=rng)
+    seen = set()
+    questions = []
+    while len(questions) < length:
+        question = deck.pick()
+        # A small category reshuffles before the others run out; skip its repeats
+        if question.qid not in seen:
+            seen.add(question.qid)
+            questions.append(question)
+    rng.shuffle(questions)
+    return questions
+
+
+def format_text(bank, seed, questions):
+    """(paper, answer sheet) as plain text"""
+    title = f"PCEP MOCK EXAM #{seed:06d}"
+    paper = ["=" * 60, title.center(60), "=" * 60,
+             "Name: ______________________________   Date: ____________", ""]
+    answers = ["=" * 60, f"{title} - ANSWERS".center(60), "=" * 60, ""]
+    for number, question in enumerate(questions, 1):
+        paper.append(f"{number}. [{bank.categories[question.category]}]")
+        paper.extend(f"   {line}" for line in question.question.splitlines())
+        paper.extend(("", "   Answer: ______________________________", ""))
+        answers.append(f"{number:>3}. {question.answer}")
+    return "\n".join(paper) + "\n", "\n".join(answers) + "\n"
+
+
+def format_markdown(bank, seed, questions):
+    """(paper, answer sheet) as Markdown"""
+    title = f"PCEP Mock Exam #{seed:06d}"
+    paper = [f"# {title}", "", "Name: ____________________ Date: __________", ""]
+    answers = [f"# {title}: answers", "", "| # | Answer | Category |", "|---|---|---|"]
+    for number, question in enumerate(questions, 1):
+        paper.extend((f"**{number}.** *{bank.categories[question.category]}*", "",
+                      "```python", question.question, "```", "",
+                      "Answer: ______________________", ""))
+        answer = question.answer.replace("|", "\\|")
+        answers.append(f"| {number} | `{answer}` | {bank.categories[question.category]} |")
+    return "\n".join(paper) + "\n", "\n".join(answers) + "\n"
+
+
+def format_json(bank, seed, questions):
+    """The paper with its answers as one JSON document"""
+    return json.dumps({
+        "paper": seed,
+        "questions": [{"number": number, "id": question.qid,
+                       "category": bank.categories[question.category],
+                       "question": question.question, "answer": question.answer}
+                      for number, question in enumerate(questions, 1)],
+    }, indent=1) + "\n", None
+
+
+FORMATTERS = {"txt": format_text, "md": format_markdown, "json": format_json}
+
+
+def write_papers(first, count, output, fmt="txt", length=DEFAULT_LENGTH, pack=None):
+    """Make and write papers first .. first + count - 1; returns how many were written"""
+    bank = load_bank(pack)
+    formatter = FORMATTERS[fmt]
+    for seed in range(first, first + count):
+        paper, answers = formatter(bank, seed, make_paper(bank, seed, length))
+        with open(os.path.join(output, f"exam-{seed:06d}.{fmt}"), "w", encoding="utf-8") as f:
+            f.write(paper)
+        if answers is not None:
+            with open(os.path.join(output, f"exam-{seed:06d}-answers.{fmt}"), "w", encoding="utf-8") as f:
+                f.write(answers)
+    return count
+
+
+def generate(papers, output, fmt="txt", length=DEFAULT_LENGTH, first_seed=1, pack=None,
+             workers=None, chunk=50, progress=None):
+    """Write `papers` papers, in chunks of seeds spread over a process pool"""
+    if chunk < 1:
+        raise ValueError(f"chunk must be at least 1, not {chunk}")
+    os.makedirs(output, exist_ok=True)
+    # Fail early, in this process, if the bank is too small for the paper length
+    make_paper(load_bank(pack), first_seed, length)
+    chunks = [(first, min(chunk, first_seed + papers - first))
+              for first in range(first_seed, first_seed + papers, chunk)]
+    workers = min(len(chunks), workers or os.cpu_count() or 1)
+    done = 0
+    if workers <= 1:
+        results = (write_papers(first, count, output, fmt, length, pack) for first, count in chunks)
+        for written in results:
+            done += written
+            if progress:
+                progress(done)
+        return done
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(write_papers, first, count, output, fmt, length, pack)
+                   for first, count in chunks]
+        for future in futures:
+            done += future.result()
+            if progress:
+                progress(done)
+    return done
+
+
+def positive_int(text):
+    """argparse type: a whole number of at least 1"""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate printable PCEP mock exam papers")
+    parser.add_argument("--papers", type=positive_int, default=10, help="how many papers (default 10)")
+    parser.add_argument("--first-seed", type=int, default=1, help="seed (paper number) of the first paper")
+    parser.add_argument("--length", type=positive_int, default=DEFAULT_LENGTH,
+                        help=f"questions per paper (default {DEFAULT_LENGTH})")
+    parser.add_argument("--format", choices=FORMATS, default="txt", help="output format (default txt)")
+    parser.add_argument("--output", default="exams", help="output directory (default exams/)")
+    parser.add_argument("--pack", help="draw from a JSONL question pack instead of the built-in bank")
+    parser.add_argument("--workers", type=positive_int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk", type=positive_int, default=50, help="papers per worker task (default 50)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+
+    def progress(done):
+        print(f"\r📝 {done:,}/{args.papers:,} papers", end="", flush=True)
+
+    try:
+        done = generate(args.papers, args.output, args.format, args.length, args.first_seed,
+                        args.pack, args.workers, args.chunk, progress)
+    except ValueError as error:
+        print(f"Cannot generate papers: {error}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Wrote {done:,} papers to {args.output}/ in {elapsed:.1f}s "
+          f"({done / elapsed:,.0f} papers/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
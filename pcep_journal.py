@@ -0,0 +1,226 @@
+"""
+SESSION JOURNAL
+Append-only record of the game being played, so a session cut short (a
+dropped terminal, a crash, Ctrl+C) can be resumed where it stopped.
+
+The journal is one JSON header line (session ID, question order, goal,
+bank shape) followed by fixed-size binary rounds:
+
+    qid (I), correct (B), ability (f), score weight (f)    13 bytes
+
+Wrong answers also need their texts (answer, question as asked, key) for
+the mistake log; those go to a side file, one JSON line per wrong round,
+written before the round itself. Fixed-size rounds are read back with a
+few strided slices per field, with no per-round Python work, and only
+the texts the mistake log will keep are decoded, so tens of thousands of
+rounds replay in milliseconds.
+
+Every round is written straight to the files (one write() call, so it
+survives the process dying) and fsync'ed in groups: every `sync_every`
+rounds or once the oldest unsynced round is `sync_interval` seconds old.
+A timer enforces the age limit, so a round is on disk within
+`sync_interval` even if no other round follows it.
+Reading stops at a torn last round, which the next append overwrites.
+A session that ends normally deletes its journal.
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+JOURNAL_VERSION = 1
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".pcep_session.journal")
+
+ROUND = struct.Struct("<IBff")
+# Wrong answers are kept as MistakeLog keeps them
+MAX_ANSWER_LENGTH = 80
+
+
+def texts_path(path):
+    """The side file with the wrong answers' texts"""
+    return path + ".mistakes"
+
+
+class SessionJournal:
+    """An open journal, appended to once per answered round"""
+
+    def __init__(self, path, fd, texts_fd, sync_every=16, sync_interval=0.2):
+        self.path = path
+        self.fd = fd
+        self.texts_fd = texts_fd
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.pending = 0
+        self.oldest = None  # monotonic time of the oldest unsynced round
+        # Syncs the group once its oldest round is sync_interval old
+        self.timer = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path, header, **options):
+        """Start a new journal (replacing any old one) with a header dict"""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        fd = os.open(path, flags, 0o600)
+        texts_fd = os.open(texts_path(path), flags, 0o600)
+        header = dict(header, version=JOURNAL_VERSION)
+        os.write(fd, json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        os.fsync(texts_fd)
+        os.fsync(fd)
+        return cls(path, fd, texts_fd, **options)
+
+    @classmethod
+    def reopen(cls, path, lengths, **options):
+        """Append to an existing journal after its valid (rounds, texts) byte lengths"""
+        fds = []
+        for name, length in zip((path, texts_path(path)), lengths):
+            fd = os.open(name, os.O_WRONLY | os.O_CREAT, 0o600)
+            os.ftruncate(fd, length)
+            os.lseek(fd, length, os.SEEK_SET)
+            fds.append(fd)
+        return cls(path, *fds, **options)
+
+    def append(self, question, answer, correct, ability=0.0, weight=0.0):
+        """Add one answered round; fsyncs when the group is full or old enough"""
+        with self.lock:
+            if not correct:
+                texts = (answer[:MAX_ANSWER_LENGTH], question.question, question.answer)
+                os.write(self.texts_fd, json.dumps(texts).encode("utf-8") + b"\n")
+            os.write(self.fd, ROUND.pack(question.qid, correct, ability, weight))
+            self.pending += 1
+            now = time.monotonic()
+            if self.oldest is None:
+                self.oldest = now
+            if self.pending >= self.sync_every or now - self.oldest >= self.sync_interval:
+                self._sync()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.sync_interval, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def sync(self):
+        """fsync the rounds written so far (also called by the timer)"""
+        with self.lock:
+            self._sync()
+
+    def _sync(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.pending and self.fd is not None:
+            # Texts first: a synced round always has its texts
+            os.fsync(self.texts_fd)
+            os.fsync(self.fd)
+            self.pending = 0
+            self.oldest = None
+
+    def close(self, discard=False):
+        """Sync and close; discard=True deletes the journal (the session ended normally)"""
+        with self.lock:
+            if self.fd is None:
+                return
+            if discard:
+                self.pending = 0
+            self._sync()
+            os.close(self.fd)
+            os.close(self.texts_fd)
+            self.fd = self.texts_fd = None
+        if discard:
+            remove(self.path)
+
+
+class Rounds:
+    """Journaled rounds as columns: qids (array I), correct (bytes of 0/1),
+    weights (array f), and the ability after the last round"""
+    __slots__ = ("qids", "correct", "weights", "ability")
+
+    def __init__(self, qids, correct, weights, ability):
+        self.qids = qids
+        self.correct = correct
+        self.weights = weights
+        self.ability = ability
+
+    def __len__(self):
+        return len(self.correct)
+
+
+def column(body, offset, typecode):
+    """One field of every record, gathered with strided slices (no per-record work)"""
+    size = struct.calcsize(typecode)
+    gathered = bytearray(len(body) // ROUND.size * size)
+    for byte in range(size):
+        gathered[byte::size] = body[offset + byte::ROUND.size]
+    values = array(typecode, gathered)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def read_journal(path, keep_texts=None):
+    """(header, rounds, texts, lengths) of a journal, or None if there is no usable one.
+
+    rounds is a Rounds; texts holds the (answer, question, key) of the
+    last `keep_texts` wrong rounds (all of them if None), oldest first;
+    lengths are the valid byte lengths of the two files, for
+    SessionJournal.reopen().
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        with open(texts_path(path), "rb") as f:
+            text_data = f.read()
+    except FileNotFoundError:
+        text_data = b""
+    except OSError:
+        return None
+    end = data.find(b"\n")
+    if end < 0:
+        return None
+    try:
+        header = json.loads(data[:end])
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("version") != JOURNAL_VERSION:
+        return None
+
+    start = end + 1
+    count = (len(data) - start) // ROUND.size
+    body = data[start:start + count * ROUND.size]
+    correct = body[4::ROUND.size]
+    # Complete text lines only; a round without its texts is torn too
+    lines = text_data.split(b"\n")[:-1]
+    wrong = count - correct.count(1)
+    if wrong > len(lines):
+        # Cut the rounds just before the first wrong one without texts
+        position = -1
+        for _ in range(len(lines) + 1):
+            position = correct.index(0, position + 1)
+        count = position
+        body = body[:count * ROUND.size]
+        correct = correct[:count]
+        wrong = len(lines)
+    lines = lines[:wrong]
+    keep = lines if keep_texts is None else lines[max(0, wrong - keep_texts):]
+    try:
+        texts = [tuple(json.loads(line)) for line in keep]
+    except ValueError:
+        return None
+    ability = ROUND.unpack_from(body, (count - 1) * ROUND.size)[2] if count else 0.0
+    rounds = Rounds(column(body, 0, "I"), correct, column(body, 9, "f"), ability)
+    lengths = (start + count * ROUND.size, sum(map(len, lines)) + len(lines))
+    return header, rounds, texts, lengths
+
+
+def remove(path):
+    """Delete a journal (e.g. one that won't be resumed)"""
+    for name in (path, texts_path(path)):
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,278 @@
+"""
+LEADERBOARDS
+Best streak, accuracy and questions answered, over all questions and per
+category, kept up to date as answers are recorded.
+
+Each leaderboard is a RankIndex: a Fenwick tree counting players per value
+plus the players holding each value. Updating a player, "my rank" and each
+step of a top-k walk are O(log V) in the value range, so nothing is ever
+re-sorted. Accuracy is ranked in basis points, and only for players with
+at least `min_questions` answers in that board.
+
+Player records are snapshotted to a JSON file every `snapshot_every`
+updates (or `snapshot_interval` seconds) and on close(); the boards are
+rebuilt from them on start. Players that can never answer again (an
+anonymous server session that was evicted) are dropped with remove().
+"""
+
+import getpass
+import itertools
+import json
+import os
+import time
+from array import array
+
+METRICS = ("best_streak", "accuracy", "answered")
+SNAPSHOT_VERSION = 1
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".pcep_leaderboards.json")
+
+
+def local_player():
+    """The terminal game's leaderboard name: the OS user, the same on every launch"""
+    try:
+        return getpass.getuser()
+    except (ImportError, KeyError, OSError):  # no user name for this process
+        return "local"
+
+
+class RankIndex:
+    """Players ranked by a non-negative integer value, higher first; ties share a rank"""
+    __slots__ = ("tree", "values", "buckets")
+
+    def __init__(self, size=64):
+        # 1-based Fenwick tree; slot v + 1 counts players with value v
+        self.tree = array("I", bytes(4 * (size + 1)))
+        self.values = {}   # player -> value
+        # value -> players with that value, in the order they reached it
+        # (dicts as ordered sets)
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def _add(self, value, delta):
+        tree = self.tree
+        i = value + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _count_at_most(self, value):
+        """Players with a value <= value"""
+        tree = self.tree
+        i = min(value + 1, len(tree) - 1)
+        count = 0
+        while i:
+            count += tree[i]
+            i -= i & -i
+        return count
+
+    def _kth(self, k):
+        """Smallest value v with k players at or below it (binary lifting)"""
+        tree = self.tree
+        position = 0
+        step = 1 << ((len(tree) - 1).bit_length() - 1)
+        while step:
+            nxt = position + step
+            if nxt < len(tree) and tree[nxt] < k:
+                position = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return position  # position + 1 is the 1-based slot, i.e. value `position`
+
+    def _grow(self, value):
+        """Double the value range until `value` fits; rebuild the tree in O(V)"""
+        size = len(self.tree) - 1
+        while size <= value:
+            size *= 2
+        tree = array("I", bytes(4 * (size + 1)))
+        for held, players in self.buckets.items():
+            tree[held + 1] = len(players)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def update(self, player, value):
+        """Set a player's value (adding the player if new)"""
+        old = self.values.get(player)
+        if old == value:
+            return
+        if old is not None:
+            self._remove(player, old)
+        if value >= len(self.tree) - 1:
+            self._grow(value)
+        self._add(value, 1)
+        self.values[player] = value
+        self.buckets.setdefault(value, {})[player] = None
+
+    def remove(self, player):
+        old = self.values.get(player)
+        if old is not None:
+            self._remove(player, old)
+
+    def _remove(self, player, old):
+        self._add(old, -1)
+        del self.values[player]
+        bucket = self.buckets[old]
+        del bucket[player]
+        if not bucket:
+            del self.buckets[old]
+
+    def rank(self, player):
+        """1 + the number of players with a higher value; None if not ranked"""
+        value = self.values.get(player)
+        if value is None:
+            return None
+        return len(self.values) - self._count_at_most(value) + 1
+
+    def top(self, k):
+        """[(rank, player, value)] for the k best players; on ties, who got there first"""
+        rows = []
+        remaining = len(self.values)
+        while remaining and len(rows) < k:
+            value = self._kth(remaining)
+            bucket = self.buckets[value]
+            rank = len(self.values) - remaining + 1
+            rows.extend((rank, player, value) for player in itertools.islice(bucket, k - len(rows)))
+            remaining -= len(bucket)
+        return rows
+
+
+class PlayerRecord:
+    """One player's counts; index -1 is the overall column, the rest are categories"""
+    __slots__ = ("correct", "total", "streak", "best")
+
+    def __init__(self, columns):
+        zeros = bytes(4 * columns)
+        self.correct = array("I", zeros)
+        self.total = array("I", zeros)
+        self.streak = array("I", zeros)
+        self.best = array("I", zeros)
+
+
+class Leaderboards:
+    """All leaderboards, fed by record() and snapshotted to `path` (if given)"""
+
+    def __init__(self, categories, path=None, min_questions=20, snapshot_every=10_000,
+                 snapshot_interval=60.0):
+        self.categories = tuple(categories)
+        self.path = path
+        self.min_questions = min_questions
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self.players = {}
+        self.boards = {}  # (metric, category index or None) -> RankIndex
+        self.dirty = 0
+        self.saved_at = time.monotonic()
+        if path and os.path.exists(path):
+            self.load()
+
+    def board(self, metric, category=None):
+        """The RankIndex for a metric, overall (None) or for a category (index or name)"""
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}")
+        if isinstance(category, str):
+            category = self.categories.index(category)
+        key = (metric, category)
+        board = self.boards.get(key)
+        if board is None:
+            board = self.boards[key] = RankIndex()
+        return board
+
+    def record(self, player, category, correct):
+        """Fold one graded answer into a player's record and every board it touches"""
+        record = self.players.get(player)
+        if record is None:
+            record = self.players[player] = PlayerRecord(len(self.categories) + 1)
+        for column, board_category in ((category, category), (-1, None)):
+            record.total[column] += 1
+            if correct:
+                record.correct[column] += 1
+                record.streak[column] += 1
+                if record.streak[column] > record.best[column]:
+                    record.best[column] = record.streak[column]
+                    self.board("best_streak", board_category).update(player, record.best[column])
+            else:
+                record.streak[column] = 0
+            self.update_counts(player, record, column, board_category)
+        self.dirty += 1
+        if self.path and (self.dirty >= self.snapshot_every or
+                          time.monotonic() - self.saved_at >= self.snapshot_interval):
+            self.snapshot()
+
+    def remove(self, player):
+        """Drop a player's record and take them off every board"""
+        if self.players.pop(player, None) is None:
+            return
+        for board in self.boards.values():
+            board.remove(player)
+        self.dirty += 1
+
+    def update_counts(self, player, record, column, category):
+        total = record.total[column]
+        self.board("answered", category).update(player, total)
+        if total >= self.min_questions:
+            self.board("accuracy", category).update(player, record.correct[column] * 10000 // total)
+
+    def top(self, metric, k=10, category=None):
+        """[(rank, player, value)]; accuracy values are in percent"""
+        rows = self.board(metric, category).top(k)
+        if metric == "accuracy":
+            rows = [(rank, player, value / 100) for rank, player, value in rows]
+        return rows
+
+    def rank(self, player, metric, category=None):
+        """(rank, players on the board); rank is None if the player isn't on it"""
+        board = self.board(metric, category)
+        return board.rank(player), len(board)
+
+    def snapshot(self):
+        """Write every player record to the snapshot file (atomically)"""
+        if not self.path:
+            return
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "categories": list(self.categories),
+            "players": {player: [list(record.correct), list(record.total),
+                                 list(record.streak), list(record.best)]
+                        for player, record in self.players.items()},
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self.dirty = 0
+        self.saved_at = time.monotonic()
+
+    def load(self):
+        """Rebuild players and boards from the snapshot file"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != SNAPSHOT_VERSION:
+            return
+        # Map saved category columns onto the current categories by name
+        columns = [(self.categories.index(name) if name in self.categories else None)
+                   for name in data["categories"]] + [-1]
+        for player, (correct, total, streak, best) in data["players"].items():
+            record = self.players[player] = PlayerRecord(len(self.categories) + 1)
+            for saved, column in enumerate(columns):
+                if column is None:
+                    continue
+                record.correct[column] = correct[saved]
+                record.total[column] = total[saved]
+                record.streak[column] = streak[saved]
+                record.best[column] = best[saved]
+            for column in [*range(len(self.categories)), -1]:
+                if record.total[column]:
+                    category = None if column == -1 else column
+                    self.board("best_streak", category).update(player, record.best[column])
+                    self.update_counts(player, record, column, category)
+
+    def close(self):
+        if self.dirty:
+            self.snapshot()
@@ -0,0 +1,197 @@
+"""
+LENIENT GRADING
+Accepts answers that are a typo or two away from the key, for keys where
+a typo can't change the meaning: Python names (exception, type and
+builtin names, keywords such as ZeroDivisionError, NoneType, continue)
+and long free-text keys like "(10) is int, (10,) is tuple". Short keys
+and values ("Hel", "12", "[1, 2]") still have to match exactly. Free
+text is compared without its spaces, so spacing never counts as a typo.
+
+The edit budget grows with the key's length. The check is a banded
+Levenshtein distance that gives up as soon as a whole row exceeds the
+budget, so a near-miss costs a few microseconds and a clear miss less.
+An answer that is itself a different Python name ("TypeError" for
+"NameError") is never taken for a typo.
+
+A BK-tree over the Python names used in the bank answers "did you mean"
+for misspelled names in a handful of distance computations.
+"""
+
+import builtins
+import keyword
+import re
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+WORD = re.compile(r"[A-Za-z]{2,}")
+
+# Names whose misspelling is still clearly the same answer
+NAMES = frozenset(
+    keyword.kwlist
+    + [name for name, value in vars(builtins).items()
+       if isinstance(value, type) and not name.startswith("_")]
+    + ["NoneType"]
+)
+LOWER_NAMES = frozenset(name.lower() for name in NAMES)
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance of a and b, or limit + 1 if it is larger than limit.
+
+    A common prefix and suffix don't change the distance, so they are cut
+    off first; a typo usually leaves only a few characters to compare.
+    Only the diagonal band |i - j| <= limit can stay within the limit, so
+    each row is computed over that band alone, and the search stops at the
+    first row whose every cell is over the limit.
+    """
+    n, m = len(a), len(b)
+    if abs(n - m) > limit:
+        return limit + 1
+    start = 0
+    while start < n and start < m and a[start] == b[start]:
+        start += 1
+    while n > start and m > start and a[n - 1] == b[m - 1]:
+        n -= 1
+        m -= 1
+    a, b = a[start:n], b[start:m]
+    n, m = n - start, m - start
+    if not n or not m:
+        return min(n + m, limit + 1)
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(m + 1)]
+    for i in range(1, n + 1):
+        current = [over] * (m + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(max(1, i - limit), min(m, i + limit) + 1):
+            value = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return previous[m]
+
+
+def edit_budget(key):
+    """Typos allowed in answers to this key (0: must match exactly)"""
+    text = " ".join(key.split())
+    if text in NAMES:
+        return 0 if len(text) < 5 else 1 if len(text) < 8 else 2
+    # Free text: several words, long enough that a slip is obviously a slip
+    if len(text) >= 12 and len(text.split()) >= 3 and len(WORD.findall(text)) >= 2:
+        return min(3, len(text) // 10)
+    return 0
+
+
+class BKTree:
+    """Burkhard-Keller tree: words at an edit distance from their parent,
+    so a search only visits children whose distance can be within range"""
+    __slots__ = ("root", "size")
+
+    def __init__(self, words=()):
+        self.root = None  # [word, {distance: child}]
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word):
+        if self.root is None:
+            self.root = [word, {}]
+            self.size = 1
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0], len(word) + len(node[0]))
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word, radius):
+        """[(distance, word)] within radius of word, nearest first"""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            # Beyond the farthest child (+ radius) the exact distance doesn't matter
+            distance = edit_distance(word, node[0], radius + max(node[1], default=0))
+            if distance <= radius:
+                found.append((distance, node[0]))
+            for edge, child in node[1].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+class LenientGrader:
+    """Typo-tolerant matching against answer keys, plus "did you mean" suggestions"""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.keys = {}  # answer key -> (normalized key, edit budget, drop spaces?)
+        # Built on the first suggestion: lower-case name -> name, and its BK-tree
+        self.names = None
+        self.tree = None
+
+    def matches(self, user_answer, key):
+        """True if user_answer is within the key's edit budget (the exact match is checked first)"""
+        entry = self.keys.get(key)
+        if entry is None:
+            budget = edit_budget(key)
+            squeeze = budget and " ".join(key.split()) not in NAMES
+            target = ("".join if squeeze else " ".join)(key.split()).lower()
+            entry = self.keys[key] = (target, budget, squeeze)
+        target, budget, squeeze = entry
+        if not budget:
+            return False
+        guess = ("".join if squeeze else " ".join)(str(user_answer).split()).lower()
+        if abs(len(guess) - len(target)) > budget:
+            return False
+        # A real name is a different answer, not a misspelling
+        if guess in LOWER_NAMES and guess != target:
+            return False
+        return edit_distance(guess, target, budget) <= budget
+
+    def build_names(self):
+        """Every Python name that appears in the bank's questions and answers"""
+        names = {}
+        for qid in range(len(self.bank)):
+            record = self.bank.get(qid)
+            text = getattr(record, "question", None) or record.text
+            for part in (text, getattr(record, "answer", "")):
+                for token in IDENTIFIER.findall(part):
+                    if token in NAMES:
+                        names[token.lower()] = token
+        self.names = names
+        self.tree = BKTree(names)
+
+    def suggest(self, user_answer, radius=2):
+        """The bank's Python name closest to a misspelled one, or None"""
+        word = user_answer.strip()
+        if not IDENTIFIER.fullmatch(word) or word.lower() in LOWER_NAMES:
+            return None
+        if self.tree is None:
+            self.build_names()
+        # Short words are near too many names to guess from
+        radius = min(radius, (len(word) - 1) // 3)
+        if radius < 1:
+            return None
+        found = self.tree.search(word.lower(), radius)
+        return self.names[found[0][1]] if found else None
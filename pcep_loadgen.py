@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+LOAD GENERATOR
+Drives a running pcep_server.py with many keep-alive clients, each playing
+its own session (GET question, POST answer, repeat), and reports
+requests/sec and latency percentiles.
+
+Usage:
+    python pcep_server.py &
+    python pcep_loadgen.py --clients 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from pcep_metrics import percentile
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection speaking JSON"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        """(status, decoded JSON body)"""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                          .encode("latin-1") + body)
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def play(host, port, deadline, accuracy, latencies, errors):
+    """One client: open a session and answer questions until the deadline"""
+    client = Client(host, port)
+    await client.connect()
+    rng = random.Random()
+    timer = time.perf_counter_ns
+    try:
+        t0 = timer()
+        status, data = await client.request("POST", "/session", {})
+        latencies.append(timer() - t0)
+        if status != 201:
+            errors.append(status)
+            return
+        base = f"/session/{data['session']}"
+        while time.monotonic() < deadline:
+            t0 = timer()
+            status, question = await client.request("GET", base + "/question")
+            t1 = timer()
+            # The answer key isn't served, so right answers are a guess at the format
+            answer = "True" if rng.random() < accuracy else "no idea"
+            status2, _ = await client.request("POST", base + "/answer", {"answer": answer})
+            t2 = timer()
+            latencies.append(t1 - t0)
+            latencies.append(t2 - t1)
+            for code in (status, status2):
+                if code != 200:
+                    errors.append(code)
+        await client.request("GET", base + "/stats")
+    finally:
+        client.close()
+
+
+async def run(host, port, clients, duration, accuracy):
+    latencies = []
+    errors = []
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(play(host, port, deadline, accuracy, latencies, errors)
+                           for _ in range(clients)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a running practice server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent connections (default 32)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (default 10)")
+    parser.add_argument("--accuracy", type=float, default=0.5, help="share of 'True' answers sent")
+    args = parser.parse_args(argv)
+
+    latencies, errors, elapsed = asyncio.run(
+        run(args.host, args.port, args.clients, args.duration, args.accuracy))
+    latencies.sort()
+    print(f"{len(latencies):,} requests in {elapsed:.1f}s over {args.clients} connections: "
+          f"{len(latencies) / elapsed:,.0f} req/s")
+    if latencies:
+        print(f"latency p50 {percentile(latencies, 0.50) / 1e6:.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) / 1e6:.2f} ms, "
+              f"max {latencies[-1] / 1e6:.2f} ms")
+    if errors:
+        print(f"{len(errors)} error responses (status codes: {sorted(set(errors))})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+MEMORY REGRESSION CHECK
+Plays a headless game for a very long session under tracemalloc and fails
+if memory keeps growing, i.e. if something (the mistake log, rendered
+questions, round formatting, metrics) is retained per round.
+
+After a warm-up (which also renders every template variant once, to fill
+the caches that only ever hold one entry per variant), a snapshot is taken every --interval rounds. Objects
+created before tracing starts are invisible to tracemalloc, so growth is
+measured from the end of the first traced interval, once everything the
+session keeps has been replaced at least once. The report shows retained
+memory per 100k rounds and the allocation sites that grew the most.
+
+Usage:
+    python pcep_memcheck.py                      # 1M simulated rounds
+    python pcep_memcheck.py --mode play          # full play_round() rounds
+    python pcep_memcheck.py --budget 32768       # bytes allowed per 100k rounds
+"""
+
+import argparse
+import builtins
+import contextlib
+import gc
+import io
+import random
+import sys
+import time
+import tracemalloc
+
+from pcep_metrics import RoundMetrics
+from pcep_practive_game import PythonPracticeGame
+from pcep_render import Renderer
+
+# Retained bytes allowed per 100k rounds; anything kept per round blows well past it
+DEFAULT_BUDGET = 64 * 1024
+
+
+class Answerer:
+    """Answers right with a fixed probability, otherwise with a new wrong string"""
+
+    def __init__(self, accuracy, seed=0):
+        self.accuracy = accuracy
+        self.rng = random.Random(seed)
+        self.rounds = 0
+
+    def __call__(self, q_data):
+        self.rounds += 1
+        if self.rng.random() < self.accuracy:
+            return q_data.answer
+        # A fresh string every time, like real typing
+        return f"guess {self.rounds}"
+
+
+@contextlib.contextmanager
+def answering(game, answerer):
+    """Make input() answer whatever question play_round() just drew"""
+    current = [None]
+    pick = game.get_random_question
+
+    def remembering_pick():
+        current[0] = pick()
+        return current[0]
+
+    real_input = builtins.input
+    game.get_random_question = remembering_pick
+    builtins.input = lambda prompt="": answerer(current[0])
+    try:
+        yield
+    finally:
+        builtins.input = real_input
+        del game.get_random_question
+
+
+def make_game(with_metrics):
+    """A headless game whose screen writes into a buffer we keep emptying"""
+    screen = Renderer(io.StringIO(), diff=False)
+    game = PythonPracticeGame(screen=screen)
+    if with_metrics:
+        game.metrics = RoundMetrics(game.bank.categories)
+    return game
+
+
+def drive(game, mode, answerer, rounds):
+    """Play `rounds` more rounds of the session"""
+    if mode == "simulate":
+        for _ in game.simulate(answerer, rounds):
+            pass
+        return
+    stream = game.screen.stream
+    with answering(game, answerer):
+        for _ in range(rounds):
+            game.play_round()
+            stream.seek(0)
+            stream.truncate()
+
+
+def prime_templates(bank):
+    """Render every template variant once, so each template's answer-forms
+    cache is full before tracing rather than filling up while it runs"""
+    # Packs have no templates (and no in-memory question list)
+    for record in getattr(bank, "questions", ()):
+        for variant in range(getattr(record, "variants", 0)):
+            record.render(variant)
+
+
+def run(rounds, interval, mode="simulate", accuracy=0.7, with_metrics=True, warmup=None, frames=1):
+    """Drive one long session; return (rounds measured, traced sizes, first and last snapshot)"""
+    game = make_game(with_metrics)
+    answerer = Answerer(accuracy)
+    # The warm-up fills every bounded structure (mistake ring, histograms,
+    # caches), so what grows afterwards is a real leak
+    drive(game, mode, answerer, warmup if warmup is not None else min(rounds, 100_000))
+    prime_templates(game.bank)
+
+    tracemalloc.start(frames)
+    try:
+        drive(game, mode, answerer, interval)
+        gc.collect()
+        first = tracemalloc.take_snapshot()
+        sizes = [tracemalloc.get_traced_memory()[0]]
+        done = 0
+        while done < rounds:
+            step = min(interval, rounds - done)
+            drive(game, mode, answerer, step)
+            done += step
+            gc.collect()
+            sizes.append(tracemalloc.get_traced_memory()[0])
+        last = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    return done, sizes, first, last
+
+
+def growth_sites(first, last, limit=10):
+    """The allocation sites that grew the most between two snapshots"""
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, __file__))
+    first = first.filter_traces(ignore)
+    last = last.filter_traces(ignore)
+    return [stat for stat in last.compare_to(first, "lineno") if stat.size_diff > 0][:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that long sessions don't grow memory")
+    parser.add_argument("--rounds", type=int, default=1_000_000, help="rounds to measure (default 1M)")
+    parser.add_argument("--interval", type=int, default=100_000,
+                        help="rounds between snapshots (default 100k)")
+    parser.add_argument("--mode", choices=("simulate", "play"), default="simulate",
+                        help="simulate(): engine only; play: full play_round() with rendering")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="share of answers that are right")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"retained bytes allowed per 100k rounds (default {DEFAULT_BUDGET})")
+    parser.add_argument("--no-metrics", action="store_true", help="leave round metrics off")
+    parser.add_argument("--top", type=int, default=10, help="growing sites to list")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    rounds, sizes, first, last = run(args.rounds, args.interval, args.mode, args.accuracy,
+                                     not args.no_metrics)
+    elapsed = time.perf_counter() - started
+
+    print(f"{rounds:,} {args.mode} rounds measured in {elapsed:.1f}s")
+    print("traced memory at each snapshot: " + ", ".join(f"{size / 1024:.0f}K" for size in sizes))
+    per_100k = (sizes[-1] - sizes[0]) * 100_000 / max(rounds, 1)
+    print(f"retained per 100k rounds: {per_100k:,.0f} bytes (budget {args.budget:,})")
+
+    sites = growth_sites(first, last, args.top)
+    if sites:
+        print("\nTop growing allocation sites:")
+        for stat in sites:
+            frame = stat.traceback[0]
+            print(f"  {stat.size_diff:>+10,} B {stat.count_diff:>+8,} blocks  {frame.filename}:{frame.lineno}")
+
+    if per_100k > args.budget:
+        print("\nFAIL: memory grows with session length.")
+        return 1
+    print("\nOK: memory stays bounded.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+ROUND METRICS
+Per-phase timings of each round (draw, render, think, grade, bookkeeping)
+in log-bucketed histograms, overall and per category and question ID.
+
+Buckets are HDR-style: 8 linear sub-buckets per power of two, so any
+recorded value is known to within 12.5% while a histogram covering
+nanoseconds to hours needs only a few hundred counters. Recording is a
+few integer operations.
+
+Export with to_json() or to_prometheus().
+"""
+
+import json
+from array import array
+
+PHASES = ("draw", "render", "think", "grade", "bookkeeping")
+
+# Sub-buckets per power of two = 2 ** SUB_BITS
+SUB_BITS = 3
+SUB_COUNT = 1 << SUB_BITS
+LINEAR_LIMIT = 2 * SUB_COUNT  # values below this get a bucket each
+
+
+def bucket_index(value):
+    """Bucket of a non-negative integer value"""
+    if value < LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return shift * SUB_COUNT + (value >> shift)
+
+
+def bucket_bounds(index):
+    """[low, high) range of values that land in a bucket"""
+    if index < LINEAR_LIMIT:
+        return index, index + 1
+    shift = index // SUB_COUNT - 1
+    low = (index - shift * SUB_COUNT) << shift
+    return low, low + (1 << shift)
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+class LogHistogram:
+    """Counts of integer values (nanoseconds here) in log-linear buckets"""
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = array("Q")  # grows to the largest bucket seen
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value):
+        index = bucket_index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend(bytes(8 * (index + 1 - len(counts))))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add another histogram's counts to this one"""
+        if len(other.counts) > len(self.counts):
+            self.counts.extend(bytes(8 * (len(other.counts) - len(self.counts))))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the given fraction of values"""
+        if not self.count:
+            return 0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_bounds(index)[1] - 1, self.max)
+        return self.max
+
+    def buckets(self):
+        """(upper bound, count) for every non-empty bucket"""
+        return [(bucket_bounds(index)[1], count) for index, count in enumerate(self.counts) if count]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "min": self.min or 0,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class RoundMetrics:
+    """Phase histograms for every round, split by category and by question ID"""
+
+    def __init__(self, categories):
+        self.categories = tuple(categories)
+        self.overall = {phase: LogHistogram() for phase in PHASES}
+        self.by_category = {phase: {} for phase in PHASES}
+        self.by_question = {phase: {} for phase in PHASES}
+
+    def record(self, phase, question, ns):
+        """Add one phase timing of one round"""
+        self.overall[phase].record(ns)
+        for table, key in ((self.by_category[phase], question.category),
+                           (self.by_question[phase], question.qid)):
+            histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = LogHistogram()
+            histogram.record(ns)
+
+    def to_json(self, buckets=False):
+        """Summaries (and optionally raw buckets) as a JSON-ready dict, in nanoseconds"""
+        def describe(histogram):
+            data = histogram.summary()
+            if buckets:
+                data["buckets"] = histogram.buckets()
+            return data
+
+        return {
+            "unit": "ns",
+            "phases": {
+                phase: {
+                    "overall": describe(self.overall[phase]),
+                    "categories": {self.categories[category]: describe(histogram)
+                                   for category, histogram in sorted(self.by_category[phase].items())},
+                    "questions": {str(qid): describe(histogram)
+                                  for qid, histogram in sorted(self.by_question[phase].items())},
+                }
+                for phase in PHASES
+            },
+        }
+
+    def to_prometheus(self):
+        """Prometheus text format, in seconds.
+
+        Per-category timings are full histograms; per-question ones are only
+        _sum and _count, to keep the series count down.
+        """
+        lines = [
+            "# HELP pcep_round_phase_seconds Time spent in each phase of a round.",
+            "# TYPE pcep_round_phase_seconds histogram",
+        ]
+        for phase in PHASES:
+            for category, histogram in sorted(self.by_category[phase].items()):
+                labels = f'phase="{phase}",category="{self.categories[category]}"'
+                cumulative = 0
+                for upper, count in histogram.buckets():
+                    cumulative += count
+                    lines.append(f'pcep_round_phase_seconds_bucket{{{labels},le="{upper / 1e9:.9g}"}} {cumulative}')
+                lines.append(f'pcep_round_phase_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"pcep_round_phase_seconds_sum{{{labels}}} {histogram.total / 1e9:.9g}")
+                lines.append(f"pcep_round_phase_seconds_count{{{labels}}} {histogram.count}")
+        lines.append("# HELP pcep_question_phase_seconds Time spent in each phase, per question ID.")
+        lines.append("# TYPE pcep_question_phase_seconds summary")
+        for phase in PHASES:
+            for qid, histogram in sorted(self.by_question[phase].items()):
+                labels = f'phase="{phase}",qid="{qid}"'
+                lines.append(f"pcep_question_phase_seconds_sum{{{labels}}} {histogram.total / 1e9:.9g}")
+                lines.append(f"pcep_question_phase_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, path):
+        """Write to a file: Prometheus text for *.prom / *.txt, JSON otherwise"""
+        with open(path, "w") as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_json(buckets=True), f, indent=2)
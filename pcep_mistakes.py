@@ -0,0 +1,110 @@
+"""
+MISTAKE LOG
+Fixed-size record of wrong answers for a session, however long it runs.
+
+The most recent mistakes live in a ring buffer (grown up to its capacity
+as mistakes come in); older ones survive only as per-question miss
+counters. Review shows one line per question, most
+missed first, with the last wrong answer given for it.
+"""
+
+# Mistakes kept in full (question + answer); older ones are only counted
+DEFAULT_CAPACITY = 256
+# Longer answers are cut, so one pasted essay can't grow the log
+MAX_ANSWER_LENGTH = 80
+
+
+class MistakeLog:
+    """Ring buffer of recent mistakes plus a miss counter per question ID"""
+    __slots__ = ("bank", "capacity", "questions", "answers", "latest", "misses", "total")
+
+    def __init__(self, bank, capacity=DEFAULT_CAPACITY):
+        self.bank = bank
+        self.capacity = capacity
+        # Slot i holds the question as asked (shared with the bank for
+        # static questions) and the wrong answer given
+        self.questions = []
+        self.answers = []
+        # qid -> slot of its newest mistake still in the ring
+        self.latest = {}
+        # qid -> times missed; only questions that were ever missed
+        self.misses = {}
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    def add(self, question, answer):
+        """Record one wrong answer"""
+        slot = self.total % self.capacity
+        answer = answer[:MAX_ANSWER_LENGTH]
+        if slot == len(self.questions):
+            self.questions.append(question)
+            self.answers.append(answer)
+        else:
+            old = self.questions[slot]
+            if self.latest.get(old.qid) == slot:
+                del self.latest[old.qid]
+            self.questions[slot] = question
+            self.answers[slot] = answer
+        self.latest[question.qid] = slot
+        self.misses[question.qid] = self.misses.get(question.qid, 0) + 1
+        self.total += 1
+
+    def restore(self, skipped, recent):
+        """Rebuild an empty log from history, as if every mistake had been add()ed.
+
+        skipped: question IDs of the oldest mistakes, only counted; recent:
+        the (question, answer) pairs after them, which must fill the ring
+        if anything was skipped.
+        """
+        if not skipped:
+            for question, answer in recent:
+                self.add(question, answer)
+            return
+        if len(recent) != self.capacity:
+            raise ValueError("recent mistakes must fill the ring")
+        misses = self.misses
+        for qid in skipped:
+            misses[qid] = misses.get(qid, 0) + 1
+        start = len(skipped)
+        self.questions = [None] * self.capacity
+        self.answers = [None] * self.capacity
+        for i, (question, answer) in enumerate(recent):
+            slot = (start + i) % self.capacity
+            self.questions[slot] = question
+            self.answers[slot] = answer[:MAX_ANSWER_LENGTH]
+            self.latest[question.qid] = slot
+            misses[question.qid] = misses.get(question.qid, 0) + 1
+        self.total = start + self.capacity
+
+    def question_text(self, qid):
+        """Text of a question that has dropped out of the ring"""
+        record = self.bank.get(qid)
+        text = getattr(record, "question", None)
+        if text is None:
+            # A template: show it with its parameters blanked out
+            text = record.text.format(*["_"] * len(record.names))
+        return text
+
+    def age(self, qid):
+        """Position of a question's newest mistake (-1 if it left the ring)"""
+        slot = self.latest.get(qid)
+        return -1 if slot is None else (slot - self.total) % self.capacity
+
+    def summary(self, limit=None):
+        """(misses, question text, correct answer, last wrong answer) per question.
+
+        Most missed come first, ties broken by the most recent. The answers
+        are None once a question's last mistake has left the ring.
+        """
+        missed = sorted(self.misses, key=lambda qid: (-self.misses[qid], -self.age(qid)))
+        rows = []
+        for qid in missed[:limit]:
+            slot = self.latest.get(qid)
+            if slot is None:
+                rows.append((self.misses[qid], self.question_text(qid), None, None))
+            else:
+                question = self.questions[slot]
+                rows.append((self.misses[qid], question.question, question.answer, self.answers[slot]))
+        return rows
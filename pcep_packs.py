@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+QUESTION PACKS
+Question banks stored on disk as JSONL, one question per line:
+
+    {"category": "indexing", "question": "...", "answer": "...", "hint": "..."}
+
+An optional "check" key holds code that reproduces the answer, for
+pcep_verify.py.
+
+Next to each pack sits a binary index (<pack>.idx) holding the byte offset
+of every question and the question IDs of every category. Loading a pack
+reads only the index header; question bodies are read through mmap when
+they are drawn, so startup time and memory stay flat even for very large
+packs. A pack in a read-only directory is indexed in memory instead.
+
+Usage:
+    python pcep_packs.py export packs/default.jsonl   # built-in bank as a pack
+    python pcep_packs.py index my_pack.jsonl          # (re)build a pack's index
+    python pcep_packs.py import my_pack.toml          # JSON/TOML pack -> JSONL + index
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+
+from pcep_questions import CATEGORIES, QUESTION_BANK, Question
+
+INDEX_MAGIC = b"PCEPIDX1"
+INDEX_VERSION = 1
+# magic, length of the JSON header that follows
+INDEX_PREFIX = struct.Struct("<8sI")
+# Rendered variants of each built-in template written by `export`
+TEMPLATE_VARIANTS = 5
+
+
+def index_path(pack_path):
+    return pack_path + ".idx"
+
+
+def encode_index(pack_path):
+    """Scan a JSONL pack and return its offset index as bytes"""
+    offsets = array("Q")
+    categories = list(CATEGORIES)
+    members = [array("I") for _ in categories]
+    with open(pack_path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                category = json.loads(line)["category"]
+                if category not in categories:
+                    # New categories are allowed; they go after the built-in ones
+                    categories.append(category)
+                    members.append(array("I"))
+                members[categories.index(category)].append(len(offsets))
+                offsets.append(offset)
+            offset += len(line)
+
+    stat = os.stat(pack_path)
+    header = {
+        "version": INDEX_VERSION,
+        "count": len(offsets),
+        "categories": [[name, len(ids)] for name, ids in zip(categories, members)],
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Pad so the arrays after the header start 8-byte aligned
+    header_bytes += b" " * (-(INDEX_PREFIX.size + len(header_bytes)) % 8)
+    return b"".join([INDEX_PREFIX.pack(INDEX_MAGIC, len(header_bytes)), header_bytes,
+                     offsets.tobytes(), *(ids.tobytes() for ids in members)])
+
+
+def build_index(pack_path):
+    """Scan a JSONL pack and write its offset index; returns the index bytes"""
+    index = encode_index(pack_path)
+    tmp_path = index_path(pack_path) + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(index)
+        os.replace(tmp_path, index_path(pack_path))
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    return index
+
+
+def read_index_header(pack_path):
+    """The index header, or None if the index is missing or out of date"""
+    try:
+        with open(index_path(pack_path), "rb") as f:
+            magic, size = INDEX_PREFIX.unpack(f.read(INDEX_PREFIX.size))
+            header = json.loads(f.read(size))
+    except (OSError, ValueError, struct.error):
+        return None
+    stat = os.stat(pack_path)
+    if (magic != INDEX_MAGIC or header.get("version") != INDEX_VERSION
+            or header["source_size"] != stat.st_size
+            or header["source_mtime_ns"] != stat.st_mtime_ns):
+        return None
+    header["data_start"] = INDEX_PREFIX.size + size
+    return header
+
+
+def unpack_index_header(index):
+    """The header of index bytes built in memory"""
+    _, size = INDEX_PREFIX.unpack_from(index)
+    header = json.loads(index[INDEX_PREFIX.size:INDEX_PREFIX.size + size])
+    header["data_start"] = INDEX_PREFIX.size + size
+    return header
+
+
+class CategoryView:
+    """Read-only sequence of one category's questions, loaded on access"""
+    __slots__ = ("bank", "ids")
+
+    def __init__(self, bank, ids):
+        self.bank = bank
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return self.bank.get(self.ids[index])
+
+
+class PackBank:
+    """A question bank backed by a JSONL pack and its index, read via mmap"""
+
+    def __init__(self, pack_path, cache_size=1024):
+        self.path = pack_path
+        header = read_index_header(pack_path)
+        self.index = None
+        if header is None:
+            try:
+                build_index(pack_path)
+                header = read_index_header(pack_path)
+            except OSError:
+                # Nowhere to write it (read-only directory): index in memory for this run
+                self.index = encode_index(pack_path)
+                header = unpack_index_header(self.index)
+
+        with open(pack_path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.index is None:
+            with open(index_path(pack_path), "rb") as f:
+                self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        count = header["count"]
+        start = header["data_start"]
+        view = memoryview(self.index)
+        self.offsets = view[start:start + 8 * count].cast("Q")
+        start += 8 * count
+        self.categories = tuple(name for name, _ in header["categories"])
+        self.category_ids = {name: i for i, name in enumerate(self.categories)}
+        views = []
+        for _, size in header["categories"]:
+            views.append(CategoryView(self, view[start:start + 4 * size].cast("I")))
+            start += 4 * size
+        self.by_category = tuple(views)
+        self.drawable = tuple(view for view in views if len(view))
+        # Packs have no shared answer-key index; check_answer falls back
+        # to canonicalizing the key it is given
+        self.answer_index = {}
+        self.get = functools.lru_cache(maxsize=cache_size)(self.load)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def load(self, qid):
+        """Read and decode one question straight from the pack"""
+        start = self.offsets[qid]
+        end = self.data.find(b"\n", start)
+        record = json.loads(self.data[start:end if end >= 0 else len(self.data)])
+        return Question(qid, self.category_ids[record["category"]],
+                        record["question"], record["answer"], record.get("hint", ""),
+                        check=record.get("check"))
+
+    def draw(self, rng=random):
+        """Pick a random category, then a random question inside it"""
+        return rng.choice(rng.choice(self.drawable))
+
+    def draw_from(self, category, rng=random):
+        """Pick a random question from one category (index or name).
+
+        A pack need not cover every built-in category; drawing from one it
+        has no questions for draws from the whole pack instead.
+        """
+        if isinstance(category, str):
+            category = self.category_ids[category]
+        bucket = self.by_category[category]
+        return rng.choice(bucket) if len(bucket) else self.draw(rng)
+
+
+def write_pack(questions, pack_path, categories=CATEGORIES):
+    """Write (category index, question, answer, hint, check) records as a JSONL pack"""
+    directory = os.path.dirname(pack_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(pack_path, "w", encoding="utf-8") as f:
+        for category, question, answer, hint, check in questions:
+            record = {"category": categories[category], "question": question,
+                      "answer": answer, "hint": hint}
+            if check is not None:
+                record["check"] = check
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    build_index(pack_path)
+
+
+def export_builtin(pack_path, variants=TEMPLATE_VARIANTS):
+    """Write the built-in bank out as a pack.
+
+    Templates are code, not data, so each one is exported as `variants`
+    of its rendered variants, picked with a generator seeded by its ID
+    (the same export always writes the same questions).
+    """
+    questions = []
+    for record in QUESTION_BANK.questions:
+        if isinstance(record, Question):
+            questions.append(record)
+        else:
+            picks = random.Random(record.qid).sample(range(record.variants), min(variants, record.variants))
+            questions.extend(record.render(variant) for variant in sorted(picks))
+    write_pack(((q.category, q.question, q.answer, q.hint, q.check) for q in questions),
+               pack_path, QUESTION_BANK.categories)
+    return len(questions)
+
+
+def import_pack(source_path):
+    """Convert a JSON or TOML pack ({"questions": [...]}) to JSONL + index"""
+    if source_path.endswith(".toml"):
+        import tomllib
+        with open(source_path, "rb") as f:
+            records = tomllib.load(f)["questions"]
+    else:
+        with open(source_path, encoding="utf-8") as f:
+            records = json.load(f)
+        if isinstance(records, dict):
+            records = records["questions"]
+    pack_path = os.path.splitext(source_path)[0] + ".jsonl"
+    with open(pack_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({key: record[key] for key in ("category", "question", "answer", "hint", "check")
+                                if key in record}, ensure_ascii=False) + "\n")
+    build_index(pack_path)
+    return pack_path, len(records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and convert question packs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("export", help="write the built-in bank as a pack").add_argument("pack")
+    commands.add_parser("index", help="(re)build the index of a JSONL pack").add_argument("pack")
+    commands.add_parser("import", help="convert a JSON/TOML pack to JSONL").add_argument("source")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        count = export_builtin(args.pack)
+        print(f"Wrote {count} questions to {args.pack}")
+    elif args.command == "index":
+        build_index(args.pack)
+        print(f"Indexed {len(PackBank(args.pack))} questions in {args.pack}")
+    else:
+        pack_path, count = import_pack(args.source)
+        print(f"Wrote {count} questions to {pack_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
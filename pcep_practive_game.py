@@ -4,614 +4,423 @@ PYTHON PCEP PRACTICE GAME
 An interactive game to practice Python fundamentals for PCEP certification
 """
 
-import random
+import argparse
+import itertools
+import signal
+import sqlite3
 import time
+from collections import Counter
+
+from pcep_lenient import LenientGrader
+from pcep_mistakes import DEFAULT_CAPACITY as MISTAKE_CAPACITY, MistakeLog
+from pcep_questions import QUESTION_BANK, Question, accepted_forms, normalize_answer
+from pcep_rating import AdaptivePicker, Ratings
+from pcep_render import Renderer
+from pcep_sampling import DeckPicker, WeaknessPicker
+from pcep_scheduler import LeitnerScheduler
+from pcep_session import SessionState
+
+
+QUIT_COMMANDS = ("quit", "exit", "q")
+# Journaled correct flags (0/1) -> 1 for the wrong rounds
+FLIP_FLAGS = bytes.maketrans(b"\0\1", b"\1\0")
+
+# Question order options: name -> factory taking the game (None = plain random)
+QUESTION_ORDERS = {
+    "Shuffled Deck": lambda game: DeckPicker(game.bank),
+    "Balanced Deck": lambda game: DeckPicker(game.bank, stratified=True),
+    "Random": None,
+    "Spaced Repetition": lambda game: LeitnerScheduler(game.bank),
+    "Focus on Weaknesses": lambda game: WeaknessPicker(
+        game.bank, game.category_correct, game.category_total),
+    "Adaptive": lambda game: AdaptivePicker(game.bank, game.enable_ratings(), game.state),
+}
+
+
+class RoundResult:
+    """Outcome of one answered round, as produced by simulate()"""
+    __slots__ = ("number", "question", "answer", "correct", "streak")
+
+    def __init__(self, number, question, answer, correct, streak):
+        self.number = number
+        self.question = question
+        self.answer = answer
+        self.correct = correct
+        self.streak = streak
+
+    def __repr__(self):
+        return f"RoundResult({self.number}, qid={self.question.qid}, correct={self.correct})"
+
+
+def state_attribute(name):
+    """A game attribute that lives on the current SessionState"""
+    return property(lambda game: getattr(game.state, name),
+                    lambda game, value: setattr(game.state, name, value),
+                    doc=f"self.state.{name}")
+
 
 class PythonPracticeGame:
-    def __init__(self):
-        self.score = 0
-        self.total_questions = 0
-        self.streak = 0
-        self.best_streak = 0
-        self.topics_covered = []
-        self.wrong_answers = []
+    # Learner state lives in self.state, so one game (the engine) can serve
+    # many sessions by switching states; see pcep_session.SessionManager
+    session_id = state_attribute("session_id")
+    score = state_attribute("score")
+    total_questions = state_attribute("total_questions")
+    streak = state_attribute("streak")
+    best_streak = state_attribute("best_streak")
+    category_correct = state_attribute("category_correct")
+    category_total = state_attribute("category_total")
+    mistakes = state_attribute("mistakes")
+    picker = state_attribute("picker")
+    question_order = state_attribute("question_order")
+
+    def __init__(self, bank=None, store=None, screen=None, metrics=None, leaderboards=None,
+                 ratings=None, lenient=None, journal_path=None, player=None):
+        self.bank = QUESTION_BANK if bank is None else bank
+        # All output goes through the renderer: one write per screen
+        self.screen = Renderer() if screen is None else screen
+        self.store = store
+        # Optional RoundMetrics that times each phase of every round
+        self.metrics = metrics
+        # Optional Leaderboards, updated with every graded answer
+        self.leaderboards = leaderboards
+        # SearchIndex for topic drills, built the first time it is needed
+        self.search_index = None
+        # player: leaderboard name (None: rank each session under its ID)
+        self.state = SessionState(len(self.bank.categories), player=player)
+        # Optional Ratings: question difficulties and the learner's ability
+        self.ratings = ratings
+        if ratings is not None:
+            self.state.ability, self.state.rated = ratings.learner
+        # Optional LenientGrader: accept typos in names and long free-text keys
+        self.lenient = lenient
+        # Where play_game() journals its rounds so they can be resumed
+        # (None: no journal); self.journal is the open one
+        self.journal_path = journal_path
+        self.journal = None
+        # The default deck has no repeats until every question has come up once
+        self.set_question_order("Shuffled Deck")
         
     def clear_screen(self):
         """Clear screen for better readability"""
-        print("\n" * 2)
+        self.screen.new_frame()
         
     def display_header(self):
         """Display game header with current stats"""
-        print("=" * 60)
-        print("🐍 PYTHON PCEP PRACTICE GAME 🐍".center(60))
-        print("=" * 60)
-        print(f"Score: {self.score}/{self.total_questions} | Streak: {self.streak} | Best: {self.best_streak}")
-        print("-" * 60)
+        self.screen.print("=" * 60)
+        self.screen.print("🐍 PYTHON PCEP PRACTICE GAME 🐍".center(60))
+        self.screen.print("=" * 60)
+        self.screen.print(f"Score: {self.score}/{self.total_questions} | Streak: {self.streak} | Best: {self.best_streak}")
+        self.screen.print("-" * 60)
         
     def get_random_question(self):
         """Returns a random question from different categories"""
-        categories = [
-            self.data_types_question,
-            self.operators_question,
-            self.list_methods_question,
-            self.string_methods_question,
-            self.control_flow_question,
-            self.dictionary_question,
-            self.tuple_question,
-            self.type_conversion_question,
-            self.indexing_question,
-            self.boolean_question,
-            self.function_question,
-            self.exception_question
-        ]
-        return random.choice(categories)()
+        picker = self.state.picker
+        if picker is not None:
+            return picker.pick()
+        return self.bank.draw()
     
     def check_answer(self, user_answer, correct_answer, case_sensitive=False):
-        """Check if answer is correct"""
-        if not case_sensitive:
-            return str(user_answer).strip().lower() == str(correct_answer).strip().lower()
-        return str(user_answer).strip() == str(correct_answer).strip()
+        """Check if answer is correct
+        
+        correct_answer may be a Question or a plain answer string. Equivalent
+        literals count as correct: [1,2,3] matches [1, 2, 3], 'a-b-c' matches
+        a-b-c and 0,1,2 matches 0, 1, 2. With a lenient grader, small typos
+        in Python names and long free-text keys count too.
+        """
+        accepted = getattr(correct_answer, "accepted", None)
+        if case_sensitive:
+            key = correct_answer if accepted is None else correct_answer.answer
+            return normalize_answer(user_answer, True) in accepted_forms(key, True)
+        if accepted is None:
+            accepted = self.bank.answer_index.get(correct_answer) or accepted_forms(correct_answer)
+        # The key as typed (up to spacing and case) needs no literal parsing
+        if " ".join(str(user_answer).split()).lower() in accepted:
+            return True
+        if normalize_answer(user_answer) in accepted:
+            return True
+        if self.lenient is not None:
+            return self.lenient.matches(user_answer, getattr(correct_answer, "answer", correct_answer))
+        return False
     
     def data_types_question(self):
         """Questions about Python data types"""
-        questions = [
-            {
-                "question": "What is the type of: 42",
-                "answer": "int",
-                "hint": "Whole number type"
-            },
-            {
-                "question": "What is the type of: 3.14",
-                "answer": "float",
-                "hint": "Decimal number type"
-            },
-            {
-                "question": "What is the type of: 'Hello'",
-                "answer": "str",
-                "hint": "Text type (3 letters)"
-            },
-            {
-                "question": "What is the type of: True",
-                "answer": "bool",
-                "hint": "True/False type"
-            },
-            {
-                "question": "What is the type of: [1, 2, 3]",
-                "answer": "list",
-                "hint": "Mutable sequence with square brackets"
-            },
-            {
-                "question": "What is the type of: (1, 2, 3)",
-                "answer": "tuple",
-                "hint": "Immutable sequence with parentheses"
-            },
-            {
-                "question": "What is the type of: {'a': 1, 'b': 2}",
-                "answer": "dict",
-                "hint": "Key-value pairs"
-            },
-            {
-                "question": "What is the type of: {1, 2, 3}",
-                "answer": "set",
-                "hint": "Unique unordered collection"
-            },
-            {
-                "question": "What is the type of: None",
-                "answer": "NoneType",
-                "hint": "Special null type"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("data_types")
     
     def operators_question(self):
         """Questions about Python operators"""
-        a, b = random.randint(1, 10), random.randint(1, 10)
-        operations = [
-            {"q": f"What is {a} + {b}?", "a": str(a + b)},
-            {"q": f"What is {a} * {b}?", "a": str(a * b)},
-            {"q": f"What is {a} ** 2?", "a": str(a ** 2)},
-            {"q": f"What is {a} // {b}?", "a": str(a // b)},
-            {"q": f"What is {a} % {b}?", "a": str(a % b)},
-            {"q": f"What is {a} == {b}? (True/False)", "a": str(a == b)},
-            {"q": f"What is {a} != {b}? (True/False)", "a": str(a != b)},
-            {"q": f"What is {a} > {b}? (True/False)", "a": str(a > b)},
-            {"q": f"What is {a} <= {b}? (True/False)", "a": str(a <= b)}
-        ]
-        op = random.choice(operations)
-        return {"question": op["q"], "answer": op["a"], "hint": "Calculate the result"}
+        return self.bank.draw_from("operators")
     
     def list_methods_question(self):
         """Questions about list methods"""
-        questions = [
-            {
-                "question": "nums = [1, 2, 3]\nnums.append(4)\nWhat is nums now?",
-                "answer": "[1, 2, 3, 4]",
-                "hint": "append adds to the end"
-            },
-            {
-                "question": "nums = [3, 1, 2]\nnums.sort()\nWhat is nums now?",
-                "answer": "[1, 2, 3]",
-                "hint": "sort arranges in ascending order"
-            },
-            {
-                "question": "nums = [1, 2, 3]\nnums.pop()\nWhat does pop() return?",
-                "answer": "3",
-                "hint": "pop() removes and returns the last element"
-            },
-            {
-                "question": "nums = [1, 2, 3, 2]\nWhat is nums.count(2)?",
-                "answer": "2",
-                "hint": "count() returns number of occurrences"
-            },
-            {
-                "question": "nums = [1, 2, 3]\nWhat is len(nums)?",
-                "answer": "3",
-                "hint": "len() returns the number of elements"
-            },
-            {
-                "question": "nums = [1, 2, 3]\nnums.insert(0, 0)\nWhat is nums now?",
-                "answer": "[0, 1, 2, 3]",
-                "hint": "insert(index, value) adds at specific position"
-            },
-            {
-                "question": "nums = [1, 2, 2, 3]\nnums.remove(2)\nWhat is nums now?",
-                "answer": "[1, 2, 3]",
-                "hint": "remove() deletes first occurrence only"
-            },
-            {
-                "question": "nums = [1, 2, 3]\nnums.reverse()\nWhat is nums now?",
-                "answer": "[3, 2, 1]",
-                "hint": "reverse() reverses in place"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("list_methods")
     
     def string_methods_question(self):
         """Questions about string methods"""
-        questions = [
-            {
-                "question": 'text = "hello"\nWhat is text.upper()?',
-                "answer": "HELLO",
-                "hint": "Converts to uppercase"
-            },
-            {
-                "question": 'text = "HELLO"\nWhat is text.lower()?',
-                "answer": "hello",
-                "hint": "Converts to lowercase"
-            },
-            {
-                "question": 'text = "a,b,c"\nWhat is text.split(",")?',
-                "answer": "['a', 'b', 'c']",
-                "hint": "Returns a list of substrings"
-            },
-            {
-                "question": 'What is "-".join(["a", "b", "c"])?',
-                "answer": "a-b-c",
-                "hint": "Joins list elements with separator"
-            },
-            {
-                "question": 'text = "hello world"\nWhat is text.replace("world", "python")?',
-                "answer": "hello python",
-                "hint": "Replaces substring"
-            },
-            {
-                "question": 'text = "  hello  "\nWhat is text.strip()?',
-                "answer": "hello",
-                "hint": "Removes whitespace from both ends"
-            },
-            {
-                "question": 'text = "Python"\nWhat is text.startswith("Py")?',
-                "answer": "True",
-                "hint": "Checks if string starts with substring"
-            },
-            {
-                "question": 'text = "Python"\nWhat is text.endswith("on")?',
-                "answer": "True",
-                "hint": "Checks if string ends with substring"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("string_methods")
     
     def control_flow_question(self):
         """Questions about control flow"""
-        questions = [
-            {
-                "question": "for i in range(3):\nWhat values will i have? (comma-separated)",
-                "answer": "0, 1, 2",
-                "hint": "range(3) starts at 0"
-            },
-            {
-                "question": "for i in range(2, 5):\nWhat values will i have? (comma-separated)",
-                "answer": "2, 3, 4",
-                "hint": "range(start, stop) - stop is exclusive"
-            },
-            {
-                "question": "x = 5\nif x > 3:\n    result = 'A'\nelse:\n    result = 'B'\nWhat is result?",
-                "answer": "A",
-                "hint": "Check the condition: is 5 > 3?"
-            },
-            {
-                "question": "count = 0\nwhile count < 2:\n    count += 1\nWhat is final count?",
-                "answer": "2",
-                "hint": "Loop continues while count < 2"
-            },
-            {
-                "question": "What keyword skips the current iteration in a loop?",
-                "answer": "continue",
-                "hint": "Not break, but c..."
-            },
-            {
-                "question": "What keyword exits a loop completely?",
-                "answer": "break",
-                "hint": "Stops the loop immediately"
-            },
-            {
-                "question": "score = 75\nif score >= 90:\n    grade = 'A'\nelif score >= 70:\n    grade = 'B'\nelse:\n    grade = 'C'\nWhat is grade?",
-                "answer": "B",
-                "hint": "75 is >= 70 but < 90"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("control_flow")
     
     def dictionary_question(self):
         """Questions about dictionaries"""
-        questions = [
-            {
-                "question": 'd = {"a": 1, "b": 2}\nWhat is d["a"]?',
-                "answer": "1",
-                "hint": "Access value by key"
-            },
-            {
-                "question": 'd = {"a": 1}\nd["b"] = 2\nHow many keys does d have now?',
-                "answer": "2",
-                "hint": "Adding a new key-value pair"
-            },
-            {
-                "question": 'd = {"a": 1, "b": 2}\nWhat does list(d.keys()) return?',
-                "answer": "['a', 'b']",
-                "hint": "Returns list of all keys"
-            },
-            {
-                "question": 'd = {"a": 1}\nWhat is d.get("b", 0)?',
-                "answer": "0",
-                "hint": "get() returns default if key not found"
-            },
-            {
-                "question": 'd = {"a": 1, "b": 2, "c": 3}\nWhat is len(d)?',
-                "answer": "3",
-                "hint": "Number of key-value pairs"
-            },
-            {
-                "question": 'd = {"a": 1, "b": 2}\n"a" in d returns what?',
-                "answer": "True",
-                "hint": "Checks if key exists"
-            },
-            {
-                "question": 'd = {"a": 1}\nd.pop("a")\nWhat does pop() return?',
-                "answer": "1",
-                "hint": "pop() removes and returns the value"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("dictionary")
     
     def tuple_question(self):
         """Questions about tuples"""
-        questions = [
-            {
-                "question": "t = (1, 2, 3)\nCan you do t[0] = 5? (yes/no)",
-                "answer": "no",
-                "hint": "Tuples are immutable"
-            },
-            {
-                "question": "t = (1, 2, 3, 2)\nWhat is t.count(2)?",
-                "answer": "2",
-                "hint": "count() works on tuples too"
-            },
-            {
-                "question": "t = (10,)\nWhat type is t?",
-                "answer": "tuple",
-                "hint": "Single element tuple needs comma"
-            },
-            {
-                "question": "x, y = (5, 10)\nWhat is x?",
-                "answer": "5",
-                "hint": "Tuple unpacking"
-            },
-            {
-                "question": "t = (1, 2, 3)\nWhat is t[1]?",
-                "answer": "2",
-                "hint": "Access by index (0-based)"
-            },
-            {
-                "question": "t = (1, 2, 3)\nWhat is len(t)?",
-                "answer": "3",
-                "hint": "Number of elements"
-            },
-            {
-                "question": "What's the difference between (10) and (10,)?",
-                "answer": "(10) is int, (10,) is tuple",
-                "hint": "Comma makes it a tuple"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("tuple")
     
     def type_conversion_question(self):
         """Questions about type conversion"""
-        questions = [
-            {
-                "question": 'int("42") returns what?',
-                "answer": "42",
-                "hint": "String to integer"
-            },
-            {
-                "question": 'str(100) returns what?',
-                "answer": "100",
-                "hint": "Integer to string (keep the value)"
-            },
-            {
-                "question": 'list("abc") returns what?',
-                "answer": "['a', 'b', 'c']",
-                "hint": "Each character becomes an element"
-            },
-            {
-                "question": 'float("3.14") returns what?',
-                "answer": "3.14",
-                "hint": "String to decimal number"
-            },
-            {
-                "question": 'bool(0) returns what?',
-                "answer": "False",
-                "hint": "0 is considered False"
-            },
-            {
-                "question": 'bool(1) returns what?',
-                "answer": "True",
-                "hint": "Non-zero is True"
-            },
-            {
-                "question": 'bool([]) returns what?',
-                "answer": "False",
-                "hint": "Empty containers are False"
-            },
-            {
-                "question": 'list((1, 2, 3)) returns what?',
-                "answer": "[1, 2, 3]",
-                "hint": "Tuple to list conversion"
-            },
-            {
-                "question": 'tuple([1, 2, 3]) returns what?',
-                "answer": "(1, 2, 3)",
-                "hint": "List to tuple conversion"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("type_conversion")
     
     def indexing_question(self):
         """Questions about indexing and slicing"""
-        questions = [
-            {
-                "question": 'text = "Python"\nWhat is text[0]?',
-                "answer": "P",
-                "hint": "First character (index 0)"
-            },
-            {
-                "question": 'text = "Python"\nWhat is text[-1]?',
-                "answer": "n",
-                "hint": "Last character"
-            },
-            {
-                "question": 'text = "Python"\nWhat is text[1:4]?',
-                "answer": "yth",
-                "hint": "From index 1 up to (not including) 4"
-            },
-            {
-                "question": 'nums = [10, 20, 30]\nWhat is nums[1]?',
-                "answer": "20",
-                "hint": "Second element (index 1)"
-            },
-            {
-                "question": 'nums = [1, 2, 3, 4, 5]\nWhat is nums[::2]?',
-                "answer": "[1, 3, 5]",
-                "hint": "Every second element"
-            },
-            {
-                "question": 'text = "Hello"\nWhat is text[:3]?',
-                "answer": "Hel",
-                "hint": "From start up to index 3"
-            },
-            {
-                "question": 'text = "Hello"\nWhat is text[2:]?',
-                "answer": "llo",
-                "hint": "From index 2 to end"
-            },
-            {
-                "question": 'nums = [0, 1, 2, 3, 4]\nWhat is nums[-2]?',
-                "answer": "3",
-                "hint": "Second from the end"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("indexing")
     
     def boolean_question(self):
         """Questions about boolean logic"""
-        questions = [
-            {
-                "question": "True and False returns what?",
-                "answer": "False",
-                "hint": "and needs both to be True"
-            },
-            {
-                "question": "True or False returns what?",
-                "answer": "True",
-                "hint": "or needs at least one True"
-            },
-            {
-                "question": "not True returns what?",
-                "answer": "False",
-                "hint": "not reverses the boolean"
-            },
-            {
-                "question": "5 > 3 and 2 < 4 returns what?",
-                "answer": "True",
-                "hint": "Both conditions are True"
-            },
-            {
-                "question": "[] is an empty list. bool([]) returns what?",
-                "answer": "False",
-                "hint": "Empty containers are False"
-            },
-            {
-                "question": "What is 10 > 5 > 1?",
-                "answer": "True",
-                "hint": "Chain comparison: 10 > 5 AND 5 > 1"
-            },
-            {
-                "question": "not False returns what?",
-                "answer": "True",
-                "hint": "not reverses the boolean"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("boolean")
     
     def function_question(self):
         """Questions about functions"""
-        questions = [
-            {
-                "question": "def greet(name):\n    return 'Hello ' + name\n\nWhat is greet('Alice')?",
-                "answer": "Hello Alice",
-                "hint": "Function concatenates strings"
-            },
-            {
-                "question": "def add(a, b=5):\n    return a + b\n\nWhat is add(3)?",
-                "answer": "8",
-                "hint": "b has default value 5"
-            },
-            {
-                "question": "def multiply(x, y):\n    return x * y\n\nWhat is multiply(4, 3)?",
-                "answer": "12",
-                "hint": "4 times 3"
-            },
-            {
-                "question": "What keyword defines a function?",
-                "answer": "def",
-                "hint": "Three letters, starts with d"
-            },
-            {
-                "question": "What keyword sends a value back from a function?",
-                "answer": "return",
-                "hint": "Sends value back to caller"
-            },
-            {
-                "question": "def test():\n    pass\n\nWhat does test() return?",
-                "answer": "None",
-                "hint": "Functions without return statement return None"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("function")
     
     def exception_question(self):
         """Questions about exceptions and errors"""
-        questions = [
-            {
-                "question": "What error: print(undefined_variable)?",
-                "answer": "NameError",
-                "hint": "Variable name not defined"
-            },
-            {
-                "question": "What error: 10 / 0?",
-                "answer": "ZeroDivisionError",
-                "hint": "Cannot divide by zero"
-            },
-            {
-                "question": "What error: [1, 2, 3][10]?",
-                "answer": "IndexError",
-                "hint": "Index out of range"
-            },
-            {
-                "question": "What error: {'a': 1}['b']?",
-                "answer": "KeyError",
-                "hint": "Dictionary key not found"
-            },
-            {
-                "question": "What error: '2' + 2?",
-                "answer": "TypeError",
-                "hint": "Cannot add string and integer"
-            },
-            {
-                "question": "What error: int('hello')?",
-                "answer": "ValueError",
-                "hint": "Invalid value for conversion"
-            }
-        ]
-        return random.choice(questions)
+        return self.bank.draw_from("exception")
+    
+    def record_answer(self, q_data, user_answer, response_ms=None, correct=None):
+        """Grade an answer (unless already graded) and update score, streak and mistakes"""
+        if correct is None:
+            correct = self.check_answer(user_answer, q_data)
+        state = self.state
+        if self.store is not None:
+            self.store.record(state.session_id, q_data, user_answer, correct, response_ms)
+        if state.picker is not None:
+            state.picker.update(q_data, correct)
+        if self.leaderboards is not None:
+            self.leaderboards.record(state.player or state.session_id, q_data.category, correct)
+        weight = 0.0
+        if self.ratings is not None:
+            # Weighted by the difficulty before this answer moves it
+            weight = self.ratings.weight(q_data.qid)
+            state.weighted_total += weight
+            if correct:
+                state.weighted_score += weight
+            self.ratings.update(state, q_data.qid, correct)
+        if self.journal is not None:
+            self.journal.append(q_data, user_answer, correct, state.ability, weight)
+        self.count_answer(q_data, user_answer, correct)
+        return correct
+    
+    def count_answer(self, q_data, user_answer, correct):
+        """Fold a graded answer into the session's score, streak, category counts and mistakes"""
+        state = self.state
+        state.category_total[q_data.category] += 1
+        if correct:
+            state.category_correct[q_data.category] += 1
+            state.score += 1
+            state.streak += 1
+            if state.streak > state.best_streak:
+                state.best_streak = state.streak
+        else:
+            if state.mistakes is None:
+                # Bounded: recent mistakes in full, older ones as per-question counts
+                state.mistakes = MistakeLog(self.bank)
+            state.mistakes.add(q_data, user_answer)
+            state.streak = 0
+        state.total_questions += 1
+    
+    def simulate(self, answers, num_questions=None):
+        """Play rounds headlessly: no input(), print() or sleeps.
+        
+        answers is either a callable that takes the question and returns the
+        answer text, or an iterable of answer strings. Yields one RoundResult
+        per round and stops after num_questions rounds, when the answers run
+        out, or on a quit command.
+        """
+        self.reset_score()
+        
+        if callable(answers):
+            provider = answers
+        else:
+            remaining = iter(answers)
+            provider = lambda q_data: next(remaining)
+            
+        rounds = range(num_questions) if num_questions else itertools.count()
+        clock = time.perf_counter_ns
+        for _ in rounds:
+            start = clock()
+            q_data = self.get_random_question()
+            drawn = clock()
+            try:
+                # Providers may hand back numbers; grade and log them as text
+                user_answer = str(provider(q_data))
+            except StopIteration:
+                return
+            answered = clock()
+            if user_answer.lower() in QUIT_COMMANDS:
+                return
+            correct = self.check_answer(user_answer, q_data)
+            graded = clock()
+            self.record_answer(q_data, user_answer, correct=correct)
+            if self.metrics is not None:
+                self.record_phases(q_data, start, drawn, drawn, answered, graded, clock())
+            yield RoundResult(self.total_questions, q_data, user_answer, correct, self.streak)
+    
+    def record_phases(self, q_data, start, drawn, asked, answered, graded, done, render_ns=0):
+        """Add one round's phase timings (perf_counter_ns stamps) to self.metrics"""
+        record = self.metrics.record
+        record("draw", q_data, drawn - start)
+        record("render", q_data, asked - drawn + render_ns)
+        record("think", q_data, answered - asked)
+        record("grade", q_data, graded - answered)
+        record("bookkeeping", q_data, done - graded)
     
     def play_round(self):
         """Play one round of the game"""
+        clock = time.perf_counter_ns
         self.clear_screen()
         self.display_header()
         
         # Get a random question
+        start = clock()
         q_data = self.get_random_question()
+        drawn = clock()
         
-        print(f"\n📝 QUESTION {self.total_questions + 1}:")
-        print("-" * 40)
-        print(q_data["question"])
-        print("-" * 40)
+        self.screen.print(f"\n📝 QUESTION {self.total_questions + 1}:")
+        self.screen.print("-" * 40)
+        self.screen.print(q_data["question"])
+        self.screen.print("-" * 40)
+        self.screen.print("\nYour answer: ", end="")
+        self.screen.flush()
         
         # Get user answer
-        user_answer = input("\nYour answer: ")
+        asked = clock()
+        user_answer = self.screen.input()
+        answered = clock()
+        response_ms = (answered - asked) // 1_000_000
         
         # Check for quit command
-        if user_answer.lower() in ['quit', 'exit', 'q']:
+        if user_answer.lower() in QUIT_COMMANDS:
             return False
         
         # Check answer
-        if self.check_answer(user_answer, q_data["answer"]):
-            print("✅ CORRECT!")
-            self.score += 1
-            self.streak += 1
-            if self.streak > self.best_streak:
-                self.best_streak = self.streak
+        correct = self.check_answer(user_answer, q_data)
+        graded = clock()
+        self.record_answer(q_data, user_answer, response_ms, correct)
+        done = clock()
+        if correct:
+            self.screen.print("✅ CORRECT!")
+            if self.lenient is not None and normalize_answer(user_answer) not in q_data.accepted:
+                self.screen.print(f"✏️ Close enough! It's spelled: {q_data['answer']}")
             if self.streak >= 3:
-                print(f"🔥 {self.streak} in a row! Keep it up!")
+                self.screen.print(f"🔥 {self.streak} in a row! Keep it up!")
         else:
-            print(f"❌ INCORRECT!")
-            print(f"Correct answer: {q_data['answer']}")
-            print(f"💡 Hint: {q_data['hint']}")
-            self.wrong_answers.append({
-                "question": q_data["question"],
-                "your_answer": user_answer,
-                "correct_answer": q_data["answer"]
-            })
-            self.streak = 0
-        
-        self.total_questions += 1
+            self.screen.print(f"❌ INCORRECT!")
+            suggestion = self.lenient.suggest(user_answer) if self.lenient is not None else None
+            if suggestion is not None:
+                self.screen.print(f"🤔 Did you mean {suggestion}?")
+            self.screen.print(f"Correct answer: {q_data['answer']}")
+            self.screen.print(f"💡 Hint: {q_data['hint']}")
         
         # Show current score
         accuracy = (self.score / self.total_questions) * 100
-        print(f"\n📊 Current accuracy: {accuracy:.1f}%")
+        self.screen.print(f"\n📊 Current accuracy: {accuracy:.1f}%")
+        if self.metrics is not None:
+            # Composing the feedback counts as render time too; it is
+            # written out with the next prompt
+            self.record_phases(q_data, start, drawn, asked, answered, graded, done, clock() - done)
         return True
         
     def show_menu(self):
         """Display game menu"""
         self.clear_screen()
         self.display_header()
-        print("\n🎮 GAME MODES:")
-        print("1. Quick Practice (5 questions)")
-        print("2. Standard Practice (10 questions)")
-        print("3. Marathon (20 questions)")
-        print("4. Endless Mode")
-        print("5. View Tips")
-        print("6. Review Mistakes")
-        print("7. Exit")
-        return input("\nChoose mode (1-7): ")
+        self.screen.print("\n🎮 GAME MODES:")
+        self.screen.print("1. Quick Practice (5 questions)")
+        self.screen.print("2. Standard Practice (10 questions)")
+        self.screen.print("3. Marathon (20 questions)")
+        self.screen.print("4. Endless Mode")
+        self.screen.print("5. View Tips")
+        self.screen.print("6. Review Mistakes")
+        self.screen.print(f"7. Question Order ({self.question_order})")
+        self.screen.print("8. Topic Drill")
+        self.screen.print("9. Exit")
+        return self.screen.input("\nChoose mode (1-9): ")
+    
+    def reset_score(self):
+        """Start a new game's score (best streak and category counts carry over)"""
+        state = self.state
+        state.score = 0
+        state.total_questions = 0
+        state.streak = 0
+        state.weighted_score = 0.0
+        state.weighted_total = 0.0
+    
+    def enable_ratings(self):
+        """self.ratings, starting unsaved ratings if there are none"""
+        if self.ratings is None:
+            self.ratings = Ratings(len(self.bank))
+        return self.ratings
+    
+    def set_question_order(self, name):
+        """Switch how questions are picked (a key of QUESTION_ORDERS)"""
+        factory = QUESTION_ORDERS[name]
+        self.picker = None if factory is None else factory(self)
+        self.question_order = name
+    
+    def choose_question_order(self):
+        """Let the player pick a question order"""
+        self.clear_screen()
+        self.screen.print("\n🔀 QUESTION ORDER:")
+        names = list(QUESTION_ORDERS)
+        for i, name in enumerate(names, 1):
+            self.screen.print(f"{i}. {name}")
+        choice = self.screen.input(f"\nChoose order (1-{len(names)}): ")
+        if choice.isdigit() and 1 <= int(choice) <= len(names):
+            self.set_question_order(names[int(choice) - 1])
+        else:
+            self.screen.print("Invalid choice. Keeping current order.")
+            self.screen.flush()
+            time.sleep(1)
+    
+    def drill_questions(self, query):
+        """IDs of the questions matching a drill query"""
+        if self.search_index is None:
+            from pcep_search import SearchIndex
+            self.search_index = SearchIndex.build(self.bank)
+        return self.search_index.search(query)
+    
+    def play_drill(self):
+        """Practice only the questions matching a topic or keyword"""
+        self.clear_screen()
+        self.screen.print("\n🎯 TOPIC DRILL")
+        self.screen.print("Type a topic or keyword, e.g. slicing, pop, KeyError")
+        self.screen.print("Combine with AND / OR: dict get OR list pop")
+        query = self.screen.input("\nDrill on: ").strip()
+        matches = self.drill_questions(query) if query else set()
+        if not matches:
+            self.screen.print(f"No questions match {query!r}.")
+            self.screen.flush()
+            time.sleep(1)
+            return
+        
+        self.screen.print(f"Found {len(matches)} matching question(s).")
+        picker = self.picker
+        self.picker = DeckPicker(self.bank, ids=sorted(matches))
+        try:
+            self.play_game(min(len(matches), 10))
+        finally:
+            self.picker = picker
     
     def show_tips(self):
         """Display PCEP study tips"""
         self.clear_screen()
-        print("=" * 60)
-        print("📚 PCEP EXAM TIPS".center(60))
-        print("=" * 60)
+        self.screen.print("=" * 60)
+        self.screen.print("📚 PCEP EXAM TIPS".center(60))
+        self.screen.print("=" * 60)
         tips = """
         KEY CONCEPTS TO MASTER:
         
@@ -664,100 +473,269 @@ class PythonPracticeGame:
         - Empty containers are False in boolean context
         - None is returned if function has no return statement
         """
-        print(tips)
-        input("\nPress Enter to continue...")
+        self.screen.print(tips)
+        self.screen.input("\nPress Enter to continue...")
     
     def review_mistakes(self):
-        """Review wrong answers from current session"""
+        """Review wrong answers (from the progress store when there is one)"""
         self.clear_screen()
-        print("=" * 60)
-        print("📝 REVIEW YOUR MISTAKES".center(60))
-        print("=" * 60)
+        self.screen.print("=" * 60)
+        self.screen.print("📝 REVIEW YOUR MISTAKES".center(60))
+        self.screen.print("=" * 60)
         
-        if not self.wrong_answers:
-            print("\n✨ No mistakes yet! Keep practicing!")
+        if self.store is not None:
+            try:
+                self.review_stored_mistakes()
+            except sqlite3.Error as exc:
+                self.screen.print(f"\n⚠️ Could not read your saved progress: {exc}")
+        elif not self.mistakes:
+            self.screen.print("\n✨ No mistakes yet! Keep practicing!")
         else:
-            print(f"\nYou had {len(self.wrong_answers)} mistake(s):\n")
-            for i, mistake in enumerate(self.wrong_answers, 1):
-                print(f"{i}. Question: {mistake['question']}")
-                print(f"   Your answer: {mistake['your_answer']}")
-                print(f"   Correct answer: {mistake['correct_answer']}")
-                print("-" * 40)
+            rows = self.mistakes.summary(limit=20)
+            self.screen.print(f"\nYou had {len(self.mistakes)} mistake(s). Most missed:\n")
+            for i, (misses, question, correct_answer, your_answer) in enumerate(rows, 1):
+                times = "once" if misses == 1 else f"{misses} times"
+                self.screen.print(f"{i}. Question: {question}")
+                if your_answer is None:
+                    self.screen.print(f"   Missed {times}")
+                else:
+                    self.screen.print(f"   Missed {times}, last answer: {your_answer}")
+                    self.screen.print(f"   Correct answer: {correct_answer}")
+                self.screen.print("-" * 40)
         
-        input("\nPress Enter to continue...")
+        self.screen.input("\nPress Enter to continue...")
     
-    def play_game(self, num_questions=None):
-        """Main game loop"""
-        self.score = 0
-        self.total_questions = 0
-        self.streak = 0
-        
-        if num_questions:
-            print(f"\n🎯 Goal: {num_questions} questions")
-            print("💡 Type 'quit' to exit early")
-            time.sleep(2)
-            
-            for i in range(num_questions):
-                if not self.play_round():
-                    print("\n👋 Exiting game...")
-                    break
-                if i < num_questions - 1:
-                    input("\nPress Enter for next question...")
+    def review_stored_mistakes(self, limit=20):
+        """Print weekly accuracy and the most missed questions from the progress store"""
+        correct, total = self.store.accuracy(days=7)
+        if total:
+            self.screen.print(f"\n📈 Last 7 days: {correct}/{total} correct ({correct / total * 100:.1f}%)")
+        rows = self.store.most_missed(limit=limit)
+        if not rows:
+            self.screen.print("\n✨ No mistakes yet! Keep practicing!")
+            return
+        self.screen.print(f"\nYou have made {self.store.mistake_count()} mistake(s). Most missed:\n")
+        categories = self.bank.categories
+        for i, (misses, qid, category, question, your_answer, correct_answer) in enumerate(rows, 1):
+            # Stored before this bank's categories changed: show the bare index
+            name = categories[category] if category < len(categories) else category
+            times = "once" if misses == 1 else f"{misses} times"
+            self.screen.print(f"{i}. [{name}] Question: {question}")
+            self.screen.print(f"   Missed {times}, last answer: {your_answer}")
+            self.screen.print(f"   Correct answer: {correct_answer}")
+            self.screen.print("-" * 40)
+    
+    def play_game(self, num_questions=None, resumed=False):
+        """Main game loop (resumed: carry on from a replayed journal)"""
+        if resumed:
+            self.screen.print(f"\n🔁 Resuming after question {self.total_questions} "
+                              f"(score {self.score}/{self.total_questions})")
         else:
-            # Endless mode
-            print("\n♾️ ENDLESS MODE - Type 'quit' to exit")
-            time.sleep(2)
-            while True:
-                if not self.play_round():
-                    print("\n👋 Exiting endless mode...")
-                    break
-                input("\nPress Enter for next question...")
+            self.reset_score()
+            self.start_journal(num_questions)
+        
+        try:
+            if num_questions:
+                self.screen.print(f"\n🎯 Goal: {num_questions} questions")
+                self.screen.print("💡 Type 'quit' to exit early")
+                self.screen.flush()
+                time.sleep(2)
+                
+                for i in range(self.total_questions, num_questions):
+                    if not self.play_round():
+                        self.screen.print("\n👋 Exiting game...")
+                        break
+                    if i < num_questions - 1:
+                        self.screen.input("\nPress Enter for next question...")
+            else:
+                # Endless mode
+                self.screen.print("\n♾️ ENDLESS MODE - Type 'quit' to exit")
+                self.screen.flush()
+                time.sleep(2)
+                while True:
+                    if not self.play_round():
+                        self.screen.print("\n👋 Exiting endless mode...")
+                        break
+                    self.screen.input("\nPress Enter for next question...")
+        except BaseException:
+            # Interrupted: keep the journal so the session can be resumed
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            raise
+        
+        if self.journal is not None:
+            self.journal.close(discard=True)
+            self.journal = None
         
         # Show final score
         if self.total_questions > 0:
             self.show_final_score()
     
+    def start_journal(self, num_questions):
+        """Open a fresh journal for a new game (if journaling is on)"""
+        if self.journal_path is None:
+            return
+        from pcep_journal import SessionJournal
+        self.journal = SessionJournal.create(self.journal_path, {
+            "session": self.session_id,
+            "order": self.question_order,
+            "questions": num_questions,
+            "started": time.time(),
+            "bank": len(self.bank),
+            "categories": list(self.bank.categories),
+            # Rated answers before this game (the ratings may be saved mid-game)
+            "rated": self.state.rated,
+        })
+    
+    def replay_journal(self, header, rounds, texts):
+        """Rebuild the session's score, streaks and mistakes from journaled rounds.
+        
+        Does in bulk what count_answer() does per round. texts holds
+        (answer, question, key) for at least the mistakes the mistake log
+        keeps in full; older mistakes are only counted.
+        """
+        self.reset_score()
+        self.session_id = header["session"]
+        if header.get("order") in QUESTION_ORDERS:
+            self.set_question_order(header["order"])
+        if not rounds:
+            return
+        state = self.state
+        bank = self.bank
+        qids, flags, weights = rounds.qids, rounds.correct, rounds.weights
+        
+        state.total_questions = len(rounds)
+        state.score = flags.count(1)
+        runs = flags.split(b"\0")
+        state.streak = len(runs[-1])
+        state.best_streak = max(state.best_streak, max(map(len, runs)))
+        state.weighted_total = sum(weights)
+        state.weighted_score = sum(itertools.compress(weights, flags))
+        # Count per question (in C), then add up per category
+        for qid, count in Counter(qids).items():
+            state.category_total[bank.get(qid).category] += count
+        for qid, count in Counter(itertools.compress(qids, flags)).items():
+            state.category_correct[bank.get(qid).category] += count
+        
+        missed = list(itertools.compress(qids, flags.translate(FLIP_FLAGS)))
+        if missed:
+            if state.mistakes is None:
+                state.mistakes = MistakeLog(bank)
+            keep = min(len(texts), state.mistakes.capacity)
+            recent = []
+            for qid, (answer, question, key) in zip(missed[len(missed) - keep:], texts[len(texts) - keep:]):
+                # The question as it was asked (templates render differently each time)
+                record = bank.get(qid)
+                recent.append((Question(qid, record.category, question, key, record.hint), answer))
+            state.mistakes.restore(missed[:len(missed) - keep], recent)
+        if self.ratings is not None:
+            state.ability = rounds.ability
+            state.rated = header.get("rated", state.rated) + len(rounds)
+    
+    def offer_resume(self):
+        """If the last session was cut short, offer to pick it up again"""
+        if self.journal_path is None:
+            return
+        from pcep_journal import SessionJournal, read_journal, remove
+        saved = read_journal(self.journal_path, keep_texts=MISTAKE_CAPACITY)
+        if saved is None:
+            remove(self.journal_path)
+            return
+        header, rounds, texts, lengths = saved
+        if (not rounds or header.get("bank") != len(self.bank)
+                or header.get("categories") != list(self.bank.categories)):
+            # Nothing to resume, or journaled against a different question bank
+            remove(self.journal_path)
+            return
+        goal = header.get("questions")
+        if goal and len(rounds) >= goal:
+            remove(self.journal_path)
+            return
+        
+        score = rounds.correct.count(1)
+        self.screen.print(f"\n💾 Your last session was interrupted after {len(rounds)} "
+                          f"question(s), score {score}/{len(rounds)}.")
+        choice = self.screen.input("Resume it? (Y/n): ").strip().lower()
+        if choice not in ("", "y", "yes"):
+            remove(self.journal_path)
+            return
+        self.replay_journal(header, rounds, texts)
+        self.journal = SessionJournal.reopen(self.journal_path, lengths)
+        self.play_game(goal, resumed=True)
+    
     def show_final_score(self):
         """Display final results"""
         self.clear_screen()
-        print("=" * 60)
-        print("🏆 GAME OVER 🏆".center(60))
-        print("=" * 60)
+        self.screen.print("=" * 60)
+        self.screen.print("🏆 GAME OVER 🏆".center(60))
+        self.screen.print("=" * 60)
         
         accuracy = (self.score / self.total_questions) * 100
-        print(f"\n📊 Final Score: {self.score}/{self.total_questions}")
-        print(f"📈 Accuracy: {accuracy:.1f}%")
-        print(f"🔥 Best Streak: {self.best_streak}")
+        self.screen.print(f"\n📊 Final Score: {self.score}/{self.total_questions}")
+        self.screen.print(f"📈 Accuracy: {accuracy:.1f}%")
+        self.screen.print(f"🔥 Best Streak: {self.best_streak}")
+        if self.ratings is not None and self.state.weighted_total:
+            weighted = self.state.weighted_score / self.state.weighted_total * 100
+            self.screen.print(f"⚖️ Difficulty-weighted accuracy: {weighted:.1f}% "
+                              f"(ability rating {self.state.ability:+.2f})")
         
         # Give feedback based on performance
         if accuracy >= 90:
-            print("\n⭐ EXCELLENT! You're ready for PCEP!")
-            print("Consider taking practice exams next.")
+            self.screen.print("\n⭐ EXCELLENT! You're ready for PCEP!")
+            self.screen.print("Consider taking practice exams next.")
         elif accuracy >= 70:
-            print("\n👍 GOOD JOB! You're getting there!")
-            print("Focus on the topics you missed.")
+            self.screen.print("\n👍 GOOD JOB! You're getting there!")
+            self.screen.print("Focus on the topics you missed.")
         elif accuracy >= 50:
-            print("\n📚 KEEP STUDYING! You're making progress.")
-            print("Review the basics and try again.")
+            self.screen.print("\n📚 KEEP STUDYING! You're making progress.")
+            self.screen.print("Review the basics and try again.")
         else:
-            print("\n💪 DON'T GIVE UP! Everyone starts somewhere.")
-            print("Review the tips and practice daily.")
+            self.screen.print("\n💪 DON'T GIVE UP! Everyone starts somewhere.")
+            self.screen.print("Review the tips and practice daily.")
+        
+        if self.mistakes:
+            self.screen.print(f"\n❗ You had {len(self.mistakes)} mistake(s)")
+            self.screen.print("Use option 6 to review them.")
         
-        if self.wrong_answers:
-            print(f"\n❗ You had {len(self.wrong_answers)} mistake(s)")
-            print("Use option 6 to review them.")
+        if self.leaderboards is not None:
+            self.show_ranks()
         
-        input("\nPress Enter to continue...")
+        self.screen.input("\nPress Enter to continue...")
+    
+    def show_ranks(self):
+        """Where this session stands on the overall leaderboards"""
+        player = self.state.player or self.session_id
+        self.screen.print("\n🏅 Leaderboards:")
+        for metric, label in (("best_streak", "best streak"), ("accuracy", "accuracy"),
+                              ("answered", "questions answered")):
+            rank, players = self.leaderboards.rank(player, metric)
+            if rank is None and metric == "accuracy":
+                self.screen.print(f"   {label}: not ranked yet "
+                                  f"(needs {self.leaderboards.min_questions} answers)")
+            elif rank is None:
+                self.screen.print(f"   {label}: not ranked yet")
+            else:
+                self.screen.print(f"   {label}: #{rank} of {players}")
     
     def run(self):
         """Run the game"""
-        print("=" * 60)
-        print("🐍 Welcome to Python PCEP Practice Game! 🐍")
-        print("=" * 60)
-        print("\nTest your knowledge of Python basics")
-        print("Perfect for PCEP certification preparation!")
+        self.screen.print("=" * 60)
+        self.screen.print("🐍 Welcome to Python PCEP Practice Game! 🐍")
+        self.screen.print("=" * 60)
+        self.screen.print("\nTest your knowledge of Python basics")
+        self.screen.print("Perfect for PCEP certification preparation!")
+        self.screen.flush()
         time.sleep(2)
-        
+        try:
+            self.offer_resume()
+            self.menu_loop()
+        finally:
+            # Also on Ctrl+C, EOF or a crash: keep what the session has learned
+            self.close()
+    
+    def menu_loop(self):
+        """Show the menu and act on choices until the player quits"""
         while True:
             choice = self.show_menu()
             
@@ -774,15 +752,75 @@ class PythonPracticeGame:
             elif choice == "6":
                 self.review_mistakes()
             elif choice == "7":
-                print("\n👋 Thanks for playing!")
-                print("Good luck with your PCEP certification! 🎓")
+                self.choose_question_order()
+            elif choice == "8":
+                self.play_drill()
+            elif choice == "9":
+                self.screen.print("\n👋 Thanks for playing!")
+                self.screen.print("Good luck with your PCEP certification! 🎓")
                 break
             else:
-                print("Invalid choice. Please try again.")
+                self.screen.print("Invalid choice. Please try again.")
+                self.screen.flush()
                 time.sleep(1)
+    
+    def close(self):
+        """Save everything the session changed; run() calls it however it ends"""
+        if self.store is not None:
+            # Writes out the rounds still queued for the writer thread
+            self.store.close()
+        if self.leaderboards is not None:
+            # The final score screen has already shown ranks that include this session
+            self.leaderboards.close()
+        if self.ratings is not None:
+            self.ratings.save(learner=(self.state.ability, self.state.rated))
+        # Last: after a hang-up the terminal may be gone
+        self.screen.flush()
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Python PCEP practice game")
+    parser.add_argument("--pack", help="play the questions from a JSONL question pack")
+    parser.add_argument("--lenient", action="store_true",
+                        help="accept small typos in Python names and long free-text answers")
+    parser.add_argument("--metrics", help="save per-phase round timings here on exit "
+                                          "(Prometheus text for .prom/.txt, JSON otherwise)")
+    args = parser.parse_args(argv)
+    
+    bank = None
+    if args.pack:
+        from pcep_packs import PackBank
+        bank = PackBank(args.pack)
+    
+    metrics = None
+    if args.metrics:
+        from pcep_metrics import RoundMetrics
+        metrics = RoundMetrics((bank or QUESTION_BANK).categories)
+    
+    from pcep_leaderboard import DEFAULT_PATH, Leaderboards, local_player
+    from pcep_progress import ProgressStore, bank_identity
+    from pcep_rating import DEFAULT_PATH as RATINGS_PATH
+    # Saved ratings are for the built-in questions; a pack's start fresh
+    ratings = Ratings(len(bank or QUESTION_BANK), None if args.pack else RATINGS_PATH)
+    lenient = LenientGrader(bank or QUESTION_BANK) if args.lenient else None
+    from pcep_journal import DEFAULT_PATH as JOURNAL_PATH
+    # Rounds are stored per bank: a pack's question IDs aren't the built-in ones
+    store = ProgressStore(bank=bank_identity(bank))
+    game = PythonPracticeGame(bank=bank, store=store, metrics=metrics,
+                              leaderboards=Leaderboards((bank or QUESTION_BANK).categories, DEFAULT_PATH),
+                              ratings=ratings, lenient=lenient, journal_path=JOURNAL_PATH,
+                              player=local_player())
+    # A dropped terminal or a kill unwinds like Ctrl+C, so run() still saves
+    def hang_up(signum, frame):
+        raise SystemExit(128 + signum)
+    for name in ("SIGHUP", "SIGTERM"):
+        if hasattr(signal, name):  # no SIGHUP on Windows
+            signal.signal(getattr(signal, name), hang_up)
+    game.run()
+    if metrics is not None:
+        metrics.save(args.metrics)
 
 # Run the game
 if __name__ == "__main__":
-    game = PythonPracticeGame()
-    game.run()
+    main()
 
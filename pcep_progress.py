@@ -0,0 +1,197 @@
+"""
+PROGRESS STORE
+Durable record of every answered round, kept in SQLite (WAL mode).
+
+Rounds are queued and written by a background thread in batches, so the
+game never waits on the disk while the learner is playing. A batch that
+fails to write (locked database, full disk) is dropped and its error
+raised by the next flush(), so readers never wait on a dead writer.
+The writer is a daemon thread; close() (also run at exit) writes out
+whatever is still queued.
+
+Question IDs and category indexes only mean something within one question
+bank, so every round records which bank it was played from: "builtin" or
+the absolute path of a pack. Readers only look at their own bank's rounds.
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB = os.path.join(os.path.expanduser("~"), ".pcep_practice.db")
+BUILTIN_BANK = "builtin"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    category INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    response_ms INTEGER,
+    -- Only kept for mistakes, so review doesn't depend on the bank version
+    question TEXT,
+    correct_answer TEXT,
+    bank TEXT NOT NULL DEFAULT 'builtin'
+);
+-- "All my mistakes in category X", newest first
+CREATE INDEX IF NOT EXISTS answers_bank_mistakes ON answers (bank, category, ts) WHERE correct = 0;
+-- "Accuracy over the last N days" is answered from the index alone
+CREATE INDEX IF NOT EXISTS answers_bank_ts ON answers (bank, ts, correct);
+DROP INDEX IF EXISTS answers_mistakes;
+DROP INDEX IF EXISTS answers_ts;
+"""
+
+INSERT = """
+INSERT INTO answers (ts, session, question_id, category, answer, correct,
+                     response_ms, question, correct_answer, bank)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+
+def connect(path):
+    """Open a connection with the pragmas every user of the store wants"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only syncs at checkpoints, not on every commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(answers)")]
+    if columns and "bank" not in columns:
+        # A store from before banks were recorded: its rounds count as built-in
+        with conn:
+            conn.execute("ALTER TABLE answers ADD COLUMN bank TEXT NOT NULL DEFAULT 'builtin'")
+    return conn
+
+
+def bank_identity(bank):
+    """What the store records as a bank's name: "builtin", or a pack's absolute path"""
+    path = getattr(bank, "path", None)
+    return BUILTIN_BANK if path is None else os.path.abspath(path)
+
+
+class ProgressStore:
+    """Answered rounds in SQLite, written through a batching queue"""
+
+    def __init__(self, path=DEFAULT_DB, bank=BUILTIN_BANK, batch_size=256, flush_interval=0.5):
+        self.path = path
+        self.bank = bank
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.conn = connect(path)
+        self.conn.executescript(SCHEMA)
+        self._queue = queue.Queue()
+        # Last write error of the writer thread, raised by the next flush()
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, name="progress-writer", daemon=True)
+        self._writer.start()
+        # Queued rounds would die with the daemon writer at exit
+        atexit.register(self.close)
+
+    def record(self, session, question, answer, correct, response_ms=None):
+        """Queue one answered round; returns immediately"""
+        if correct:
+            row = (time.time(), session, question.qid, question.category, answer, 1,
+                   response_ms, None, None, self.bank)
+        else:
+            row = (time.time(), session, question.qid, question.category, answer, 0,
+                   response_ms, question.question, question.answer, self.bank)
+        self._queue.put(row)
+
+    def _write_loop(self):
+        """Background thread: drain the queue into batched transactions"""
+        conn = None
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not _STOP]
+            stop = len(rows) != len(batch)
+            try:
+                if rows:
+                    if conn is None:
+                        conn = connect(self.path)
+                    with conn:
+                        conn.executemany(INSERT, rows)
+            except Exception as exc:
+                # The batch is lost, but the thread keeps serving the queue
+                self._error = exc
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if conn is not None:
+            conn.close()
+
+    def flush(self):
+        """Block until everything queued so far is written; raises the last write error, once"""
+        self._queue.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Write out pending rounds and stop the writer thread"""
+        atexit.unregister(self.close)
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self.conn.close()
+
+    def mistakes(self, category=None, limit=50):
+        """Most recent wrong answers, optionally for one category index"""
+        self.flush()
+        sql = ("SELECT ts, question_id, category, question, answer, correct_answer "
+               "FROM answers WHERE bank = ? AND correct = 0")
+        params = (self.bank,)
+        if category is not None:
+            sql += " AND category = ?"
+            params += (category,)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        return self.conn.execute(sql, params + (limit,)).fetchall()
+
+    def most_missed(self, category=None, limit=20):
+        """(misses, question_id, category, question, last answer, correct answer) per missed question.
+
+        Most missed first, ties broken by the most recent; the texts are
+        those of each question's latest mistake.
+        """
+        self.flush()
+        # With MAX(), SQLite takes the bare columns from the row holding the maximum
+        sql = ("SELECT COUNT(*) AS misses, question_id, category, question, answer, correct_answer, "
+               "MAX(ts) AS last FROM answers WHERE bank = ? AND correct = 0")
+        params = (self.bank,)
+        if category is not None:
+            sql += " AND category = ?"
+            params += (category,)
+        sql += " GROUP BY question_id ORDER BY misses DESC, last DESC LIMIT ?"
+        return [row[:6] for row in self.conn.execute(sql, params + (limit,))]
+
+    def mistake_count(self):
+        """Wrong answers stored for this bank"""
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM answers WHERE bank = ? AND correct = 0",
+                                 (self.bank,)).fetchone()[0]
+
+    def accuracy(self, days=7):
+        """(correct, total) over the last `days` days"""
+        self.flush()
+        since = time.time() - days * 86400
+        correct, total = self.conn.execute(
+            "SELECT TOTAL(correct), COUNT(*) FROM answers WHERE bank = ? AND ts >= ?",
+            (self.bank, since)
+        ).fetchone()
+        return int(correct), total
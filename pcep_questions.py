@@ -0,0 +1,627 @@
+#!/usr/bin/env python3
+"""
+QUESTION BANK
+All question content, plus the immutable, indexed records it is built into.
+
+Building the bank canonicalizes every answer key, so the finished bank is
+cached in a compiled binary file (__pycache__/pcep_bank.bin) keyed by a hash
+of this file. Later starts load it with a single read and only rebuild it
+when the questions change. `python pcep_questions.py compile` rebuilds it
+by hand.
+"""
+
+import hashlib
+import os
+import random
+import struct
+import sys
+from array import array
+
+# Category order matches the order questions used to be drawn in
+CATEGORIES = (
+    "data_types",
+    "operators",
+    "list_methods",
+    "string_methods",
+    "control_flow",
+    "dictionary",
+    "tuple",
+    "type_conversion",
+    "indexing",
+    "boolean",
+    "function",
+    "exception",
+)
+CATEGORY_INDEX = {name: i for i, name in enumerate(CATEGORIES)}
+
+# Static question content: category -> ((question, answer, hint[, check]), ...)
+# `check` is runnable code whose last expression evaluates to the answer (or
+# raises the exception that is the answer); pcep_verify.py runs it.
+RAW_QUESTIONS = {
+    "data_types": (
+        ("What is the type of: 42", "int", "Whole number type",
+         "type(42).__name__"),
+        ("What is the type of: 3.14", "float", "Decimal number type",
+         "type(3.14).__name__"),
+        ("What is the type of: 'Hello'", "str", "Text type (3 letters)",
+         "type('Hello').__name__"),
+        ("What is the type of: True", "bool", "True/False type",
+         "type(True).__name__"),
+        ("What is the type of: [1, 2, 3]", "list", "Mutable sequence with square brackets",
+         "type([1, 2, 3]).__name__"),
+        ("What is the type of: (1, 2, 3)", "tuple", "Immutable sequence with parentheses",
+         "type((1, 2, 3)).__name__"),
+        ("What is the type of: {'a': 1, 'b': 2}", "dict", "Key-value pairs",
+         "type({'a': 1, 'b': 2}).__name__"),
+        ("What is the type of: {1, 2, 3}", "set", "Unique unordered collection",
+         "type({1, 2, 3}).__name__"),
+        ("What is the type of: None", "NoneType", "Special null type",
+         "type(None).__name__"),
+    ),
+    "list_methods": (
+        ("nums = [1, 2, 3]\nnums.append(4)\nWhat is nums now?", "[1, 2, 3, 4]", "append adds to the end",
+         "nums = [1, 2, 3]\nnums.append(4)\nnums"),
+        ("nums = [3, 1, 2]\nnums.sort()\nWhat is nums now?", "[1, 2, 3]", "sort arranges in ascending order",
+         "nums = [3, 1, 2]\nnums.sort()\nnums"),
+        ("nums = [1, 2, 3]\nnums.pop()\nWhat does pop() return?", "3", "pop() removes and returns the last element",
+         "nums = [1, 2, 3]\nnums.pop()"),
+        ("nums = [1, 2, 3, 2]\nWhat is nums.count(2)?", "2", "count() returns number of occurrences",
+         "nums = [1, 2, 3, 2]\nnums.count(2)"),
+        ("nums = [1, 2, 3]\nWhat is len(nums)?", "3", "len() returns the number of elements",
+         "nums = [1, 2, 3]\nlen(nums)"),
+        ("nums = [1, 2, 3]\nnums.insert(0, 0)\nWhat is nums now?", "[0, 1, 2, 3]", "insert(index, value) adds at specific position",
+         "nums = [1, 2, 3]\nnums.insert(0, 0)\nnums"),
+        ("nums = [1, 2, 2, 3]\nnums.remove(2)\nWhat is nums now?", "[1, 2, 3]", "remove() deletes first occurrence only",
+         "nums = [1, 2, 2, 3]\nnums.remove(2)\nnums"),
+        ("nums = [1, 2, 3]\nnums.reverse()\nWhat is nums now?", "[3, 2, 1]", "reverse() reverses in place",
+         "nums = [1, 2, 3]\nnums.reverse()\nnums"),
+    ),
+    "string_methods": (
+        ('text = "hello"\nWhat is text.upper()?', "HELLO", "Converts to uppercase",
+         'text = "hello"\ntext.upper()'),
+        ('text = "HELLO"\nWhat is text.lower()?', "hello", "Converts to lowercase",
+         'text = "HELLO"\ntext.lower()'),
+        ('text = "a,b,c"\nWhat is text.split(",")?', "['a', 'b', 'c']", "Returns a list of substrings",
+         'text = "a,b,c"\ntext.split(",")'),
+        ('What is "-".join(["a", "b", "c"])?', "a-b-c", "Joins list elements with separator",
+         '"-".join(["a", "b", "c"])'),
+        ('text = "hello world"\nWhat is text.replace("world", "python")?', "hello python", "Replaces substring",
+         'text = "hello world"\ntext.replace("world", "python")'),
+        ('text = "  hello  "\nWhat is text.strip()?', "hello", "Removes whitespace from both ends",
+         'text = "  hello  "\ntext.strip()'),
+        ('text = "Python"\nWhat is text.startswith("Py")?', "True", "Checks if string starts with substring",
+         'text = "Python"\ntext.startswith("Py")'),
+        ('text = "Python"\nWhat is text.endswith("on")?', "True", "Checks if string ends with substring",
+         'text = "Python"\ntext.endswith("on")'),
+    ),
+    "control_flow": (
+        ("for i in range(3):\nWhat values will i have? (comma-separated)", "0, 1, 2", "range(3) starts at 0",
+         "tuple(range(3))"),
+        ("for i in range(2, 5):\nWhat values will i have? (comma-separated)", "2, 3, 4", "range(start, stop) - stop is exclusive",
+         "tuple(range(2, 5))"),
+        ("x = 5\nif x > 3:\n    result = 'A'\nelse:\n    result = 'B'\nWhat is result?", "A", "Check the condition: is 5 > 3?",
+         "x = 5\nif x > 3:\n    result = 'A'\nelse:\n    result = 'B'\nresult"),
+        ("count = 0\nwhile count < 2:\n    count += 1\nWhat is final count?", "2", "Loop continues while count < 2",
+         "count = 0\nwhile count < 2:\n    count += 1\ncount"),
+        ("What keyword skips the current iteration in a loop?", "continue", "Not break, but c..."),
+        ("What keyword exits a loop completely?", "break", "Stops the loop immediately"),
+        ("score = 75\nif score >= 90:\n    grade = 'A'\nelif score >= 70:\n    grade = 'B'\nelse:\n    grade = 'C'\nWhat is grade?", "B", "75 is >= 70 but < 90",
+         "score = 75\nif score >= 90:\n    grade = 'A'\nelif score >= 70:\n    grade = 'B'\nelse:\n    grade = 'C'\ngrade"),
+    ),
+    "dictionary": (
+        ('d = {"a": 1, "b": 2}\nWhat is d["a"]?', "1", "Access value by key",
+         'd = {"a": 1, "b": 2}\nd["a"]'),
+        ('d = {"a": 1}\nd["b"] = 2\nHow many keys does d have now?', "2", "Adding a new key-value pair",
+         'd = {"a": 1}\nd["b"] = 2\nlen(d)'),
+        ('d = {"a": 1, "b": 2}\nWhat does list(d.keys()) return?', "['a', 'b']", "Returns list of all keys",
+         'd = {"a": 1, "b": 2}\nlist(d.keys())'),
+        ('d = {"a": 1}\nWhat is d.get("b", 0)?', "0", "get() returns default if key not found",
+         'd = {"a": 1}\nd.get("b", 0)'),
+        ('d = {"a": 1, "b": 2, "c": 3}\nWhat is len(d)?', "3", "Number of key-value pairs",
+         'd = {"a": 1, "b": 2, "c": 3}\nlen(d)'),
+        ('d = {"a": 1, "b": 2}\n"a" in d returns what?', "True", "Checks if key exists",
+         'd = {"a": 1, "b": 2}\n"a" in d'),
+        ('d = {"a": 1}\nd.pop("a")\nWhat does pop() return?', "1", "pop() removes and returns the value",
+         'd = {"a": 1}\nd.pop("a")'),
+    ),
+    "tuple": (
+        ("t = (1, 2, 3)\nCan you do t[0] = 5? (yes/no)", "no", "Tuples are immutable"),
+        ("t = (1, 2, 3, 2)\nWhat is t.count(2)?", "2", "count() works on tuples too",
+         "t = (1, 2, 3, 2)\nt.count(2)"),
+        ("t = (10,)\nWhat type is t?", "tuple", "Single element tuple needs comma",
+         "t = (10,)\ntype(t).__name__"),
+        ("x, y = (5, 10)\nWhat is x?", "5", "Tuple unpacking",
+         "x, y = (5, 10)\nx"),
+        ("t = (1, 2, 3)\nWhat is t[1]?", "2", "Access by index (0-based)",
+         "t = (1, 2, 3)\nt[1]"),
+        ("t = (1, 2, 3)\nWhat is len(t)?", "3", "Number of elements",
+         "t = (1, 2, 3)\nlen(t)"),
+        ("What's the difference between (10) and (10,)?", "(10) is int, (10,) is tuple", "Comma makes it a tuple"),
+    ),
+    "type_conversion": (
+        ('int("42") returns what?', "42", "String to integer",
+         'int("42")'),
+        ('str(100) returns what?', "100", "Integer to string (keep the value)",
+         "str(100)"),
+        ('list("abc") returns what?', "['a', 'b', 'c']", "Each character becomes an element",
+         'list("abc")'),
+        ('float("3.14") returns what?', "3.14", "String to decimal number",
+         'float("3.14")'),
+        ('bool(0) returns what?', "False", "0 is considered False",
+         "bool(0)"),
+        ('bool(1) returns what?', "True", "Non-zero is True",
+         "bool(1)"),
+        ('bool([]) returns what?', "False", "Empty containers are False",
+         "bool([])"),
+        ('list((1, 2, 3)) returns what?', "[1, 2, 3]", "Tuple to list conversion",
+         "list((1, 2, 3))"),
+        ('tuple([1, 2, 3]) returns what?', "(1, 2, 3)", "List to tuple conversion",
+         "tuple([1, 2, 3])"),
+    ),
+    "indexing": (
+        ('text = "Python"\nWhat is text[0]?', "P", "First character (index 0)",
+         'text = "Python"\ntext[0]'),
+        ('text = "Python"\nWhat is text[-1]?', "n", "Last character",
+         'text = "Python"\ntext[-1]'),
+        ('text = "Python"\nWhat is text[1:4]?', "yth", "From index 1 up to (not including) 4",
+         'text = "Python"\ntext[1:4]'),
+        ('nums = [10, 20, 30]\nWhat is nums[1]?', "20", "Second element (index 1)",
+         "nums = [10, 20, 30]\nnums[1]"),
+        ('nums = [1, 2, 3, 4, 5]\nWhat is nums[::2]?', "[1, 3, 5]", "Every second element",
+         "nums = [1, 2, 3, 4, 5]\nnums[::2]"),
+        ('text = "Hello"\nWhat is text[:3]?', "Hel", "From start up to index 3",
+         'text = "Hello"\ntext[:3]'),
+        ('text = "Hello"\nWhat is text[2:]?', "llo", "From index 2 to end",
+         'text = "Hello"\ntext[2:]'),
+        ('nums = [0, 1, 2, 3, 4]\nWhat is nums[-2]?', "3", "Second from the end",
+         "nums = [0, 1, 2, 3, 4]\nnums[-2]"),
+    ),
+    "boolean": (
+        ("True and False returns what?", "False", "and needs both to be True",
+         "True and False"),
+        ("True or False returns what?", "True", "or needs at least one True",
+         "True or False"),
+        ("not True returns what?", "False", "not reverses the boolean",
+         "not True"),
+        ("5 > 3 and 2 < 4 returns what?", "True", "Both conditions are True",
+         "5 > 3 and 2 < 4"),
+        ("[] is an empty list. bool([]) returns what?", "False", "Empty containers are False",
+         "bool([])"),
+        ("What is 10 > 5 > 1?", "True", "Chain comparison: 10 > 5 AND 5 > 1",
+         "10 > 5 > 1"),
+        ("not False returns what?", "True", "not reverses the boolean",
+         "not False"),
+    ),
+    "function": (
+        ("def greet(name):\n    return 'Hello ' + name\n\nWhat is greet('Alice')?", "Hello Alice", "Function concatenates strings",
+         "def greet(name):\n    return 'Hello ' + name\ngreet('Alice')"),
+        ("def add(a, b=5):\n    return a + b\n\nWhat is add(3)?", "8", "b has default value 5",
+         "def add(a, b=5):\n    return a + b\nadd(3)"),
+        ("def multiply(x, y):\n    return x * y\n\nWhat is multiply(4, 3)?", "12", "4 times 3",
+         "def multiply(x, y):\n    return x * y\nmultiply(4, 3)"),
+        ("What keyword defines a function?", "def", "Three letters, starts with d"),
+        ("What keyword sends a value back from a function?", "return", "Sends value back to caller"),
+        ("def test():\n    pass\n\nWhat does test() return?", "None", "Functions without return statement return None",
+         "def test():\n    pass\ntest()"),
+    ),
+    "exception": (
+        ("What error: print(undefined_variable)?", "NameError", "Variable name not defined",
+         "print(undefined_variable)"),
+        ("What error: 10 / 0?", "ZeroDivisionError", "Cannot divide by zero",
+         "10 / 0"),
+        ("What error: [1, 2, 3][10]?", "IndexError", "Index out of range",
+         "[1, 2, 3][10]"),
+        ("What error: {'a': 1}['b']?", "KeyError", "Dictionary key not found",
+         "{'a': 1}['b']"),
+        ("What error: '2' + 2?", "TypeError", "Cannot add string and integer",
+         "'2' + 2"),
+        ("What error: int('hello')?", "ValueError", "Invalid value for conversion",
+         "int('hello')"),
+    ),
+}
+
+# (question template, expression, answer function) for the arithmetic/comparison questions
+OPERATIONS = (
+    ("What is {a} + {b}?", "{a} + {b}", lambda a, b: a + b),
+    ("What is {a} * {b}?", "{a} * {b}", lambda a, b: a * b),
+    ("What is {a} ** 2?", "{a} ** 2", lambda a, b: a ** 2),
+    ("What is {a} // {b}?", "{a} // {b}", lambda a, b: a // b),
+    ("What is {a} % {b}?", "{a} % {b}", lambda a, b: a % b),
+    ("What is {a} == {b}? (True/False)", "{a} == {b}", lambda a, b: a == b),
+    ("What is {a} != {b}? (True/False)", "{a} != {b}", lambda a, b: a != b),
+    ("What is {a} > {b}? (True/False)", "{a} > {b}", lambda a, b: a > b),
+    ("What is {a} <= {b}? (True/False)", "{a} <= {b}", lambda a, b: a <= b),
+)
+
+# Six-letter words, so every index in range(-6, 6) is valid
+WORDS = ("Python", "banana", "coding", "string", "lambda", "method", "syntax", "random")
+
+# Parametric questions: category -> ((question, {param: values}, answer function, hint[, check]), ...)
+# Every combination of parameter values is one variant; only the variant
+# that is drawn ever gets rendered. `check` is filled in like the question.
+TEMPLATES = {
+    "operators": tuple(
+        (text, {"a": range(1, 11), "b": range(1, 11)}, func, "Calculate the result", check)
+        for text, check, func in OPERATIONS
+    ),
+    "control_flow": (
+        ("for i in range({start}, {stop}):\nWhat values will i have? (comma-separated)",
+         {"start": range(0, 4), "stop": range(4, 8)},
+         lambda start, stop: ", ".join(map(str, range(start, stop))),
+         "range(start, stop) - stop is exclusive",
+         '", ".join(map(str, range({start}, {stop})))'),
+        ("for i in range({start}, {stop}, {step}):\nWhat values will i have? (comma-separated)",
+         {"start": range(0, 3), "stop": range(7, 12), "step": range(2, 4)},
+         lambda start, stop, step: ", ".join(map(str, range(start, stop, step))),
+         "range(start, stop, step) counts up by step, stop is exclusive",
+         '", ".join(map(str, range({start}, {stop}, {step})))'),
+    ),
+    "type_conversion": (
+        ('int("{n}") returns what?', {"n": range(1000)}, lambda n: n, "String to integer",
+         'int("{n}")'),
+        ("str({n}) returns what?", {"n": range(1000)}, lambda n: n, "Integer to string (keep the value)",
+         "str({n})"),
+        ("int({whole}.{tenths}) returns what?", {"whole": range(20), "tenths": range(1, 10)},
+         lambda whole, tenths: whole, "int() drops the fractional part", "int({whole}.{tenths})"),
+        ("bool({n}) returns what?", {"n": range(-3, 4)}, lambda n: bool(n), "Only 0 is False",
+         "bool({n})"),
+        ('list("{word}") returns what?', {"word": ("abc", "hi", "cat", "xyz", "dog")},
+         lambda word: list(word), "Each character becomes an element", 'list("{word}")'),
+    ),
+    "indexing": (
+        ('text = "{word}"\nWhat is text[{i}]?', {"word": WORDS, "i": range(-6, 6)},
+         lambda word, i: word[i], "Indexes start at 0; negative ones count from the end",
+         'text = "{word}"\ntext[{i}]'),
+        ('text = "{word}"\nWhat is text[{start}:{stop}]?',
+         {"word": WORDS, "start": range(0, 3), "stop": range(3, 7)},
+         lambda word, start, stop: word[start:stop], "From start up to (not including) stop",
+         'text = "{word}"\ntext[{start}:{stop}]'),
+        ("nums = list(range({n}))\nWhat is nums[::{step}]?", {"n": range(4, 11), "step": range(2, 4)},
+         lambda n, step: list(range(n))[::step], "Every step-th element, starting at index 0",
+         "nums = list(range({n}))\nnums[::{step}]"),
+        ("nums = list(range({n}))\nWhat is nums[-{k}:]?", {"n": range(5, 11), "k": range(1, 4)},
+         lambda n, k: list(range(n))[-k:], "The last k elements",
+         "nums = list(range({n}))\nnums[-{k}:]"),
+    ),
+}
+
+
+# Characters that mean a submission may be a container or string literal
+LITERAL_MARKERS = frozenset("[](){}'\",")
+
+
+def normalize_answer(text, case_sensitive=False):
+    """Canonical form of an answer.
+    
+    Whitespace runs are collapsed; anything that parses as a Python literal
+    is re-printed with repr() (so [1,2,3] and [1, 2, 3] agree) and quoted
+    strings lose their quotes.
+    """
+    text = " ".join(str(text).split())
+    # Plain words and plain integers are already canonical; skip the parser
+    if not LITERAL_MARKERS.isdisjoint(text) or (text[:1].isdigit() and not text.isdigit()):
+        # Imported here: with a compiled bank, startup never needs the parser
+        import ast
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            pass
+        else:
+            text = value if isinstance(value, str) else repr(value)
+    return text if case_sensitive else text.lower()
+
+
+def accepted_forms(answer, case_sensitive=False):
+    """Every normalized form that counts as a match for an answer key"""
+    collapsed = " ".join(str(answer).split())
+    if not case_sensitive:
+        collapsed = collapsed.lower()
+    return frozenset((collapsed, normalize_answer(answer, case_sensitive)))
+
+
+class Question:
+    """One immutable question record with a stable ID and category index"""
+    __slots__ = ("qid", "category", "question", "answer", "hint", "_accepted", "check")
+
+    def __init__(self, qid, category, question, answer, hint, accepted=None, check=None):
+        self.qid = qid
+        self.category = category
+        self.question = question
+        self.answer = answer
+        self.hint = hint
+        self._accepted = accepted
+        # Code that reproduces the answer, for pcep_verify.py (None: not checkable)
+        self.check = check
+
+    @property
+    def accepted(self):
+        """Canonical answer forms, computed once so grading is a set lookup"""
+        if self._accepted is None:
+            self._accepted = accepted_forms(self.answer)
+        return self._accepted
+
+    def draw(self, rng=random):
+        """A static question always renders as itself"""
+        return self
+
+    def __getitem__(self, key):
+        """Allow dict-style access (q["question"]) like the old question dicts"""
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"Question({self.qid}, {self.category}, {self.question!r})"
+
+
+class QuestionTemplate:
+    """A parametric question; each variant renders to a Question on demand.
+    
+    Variants are numbered 0..variants-1, and variant n always renders the
+    same way, so generation is deterministic for a seeded rng. All variants
+    share the template's question ID.
+    """
+    __slots__ = ("qid", "category", "text", "names", "choices", "answer_func", "hint", "check",
+                 "variants", "forms")
+
+    def __init__(self, qid, category, text, params, answer_func, hint, check=None):
+        self.qid = qid
+        self.category = category
+        self.names = tuple(params)
+        self.choices = tuple(params.values())
+        # Positional fields ({0}, {1}) format faster than named ones; the
+        # answer function takes the parameters in the same order
+        for i, name in enumerate(self.names):
+            text = text.replace("{%s}" % name, "{%d}" % i)
+            if check is not None:
+                check = check.replace("{%s}" % name, "{%d}" % i)
+        self.text = text
+        self.answer_func = answer_func
+        self.hint = hint
+        self.check = check
+        self.variants = 1
+        for values in self.choices:
+            self.variants *= len(values)
+        # Answer text -> accepted forms; at most one entry per variant
+        self.forms = {}
+
+    def arguments(self, variant):
+        """Parameter values of one variant (a mixed-radix decode of its number)"""
+        args = []
+        for values in self.choices:
+            variant, digit = divmod(variant, len(values))
+            args.append(values[digit])
+        return args
+
+    def render(self, variant):
+        """Build the Question for one variant"""
+        args = self.arguments(variant)
+        answer = str(self.answer_func(*args))
+        # Variants repeat their answers; canonicalize each one only once
+        accepted = self.forms.get(answer)
+        if accepted is None:
+            accepted = self.forms[answer] = accepted_forms(answer)
+        return Question(self.qid, self.category, self.text.format(*args), answer, self.hint,
+                        accepted, self.check and self.check.format(*args))
+
+    def draw(self, rng=random):
+        """Render one random variant"""
+        return self.render(rng.randrange(self.variants))
+
+    def __repr__(self):
+        return f"QuestionTemplate({self.qid}, {self.category}, {self.text!r})"
+
+
+def build_questions():
+    """Static Question records for all the content in RAW_QUESTIONS"""
+    questions = []
+    forms = {}
+    for name, rows in RAW_QUESTIONS.items():
+        category = CATEGORY_INDEX[name]
+        for question, answer, hint, *check in rows:
+            # Questions with the same key share one accepted-forms set
+            accepted = forms.get(answer)
+            if accepted is None:
+                accepted = forms[answer] = accepted_forms(answer)
+            questions.append(Question(len(questions), category, question, answer, hint, accepted,
+                                      check[0] if check else None))
+    return questions
+
+
+def build_templates(first_id):
+    """QuestionTemplate records for TEMPLATES, numbered from first_id"""
+    templates = []
+    for name, specs in TEMPLATES.items():
+        for text, params, answer_func, hint, *check in specs:
+            templates.append(QuestionTemplate(first_id + len(templates), CATEGORY_INDEX[name],
+                                              text, params, answer_func, hint, *check))
+    return templates
+
+
+class QuestionBank:
+    """All questions and templates, built once and indexed by ID and by category"""
+    __slots__ = ("categories", "questions", "by_category", "answer_index")
+
+    def __init__(self, questions, categories=CATEGORIES):
+        self.categories = tuple(categories)
+        self.questions = tuple(questions)
+        buckets = [[] for _ in self.categories]
+        self.answer_index = {}
+        for q in self.questions:
+            buckets[q.category].append(q)
+            if isinstance(q, Question):
+                self.answer_index.setdefault(q.answer, q.accepted)
+        self.by_category = tuple(tuple(bucket) for bucket in buckets)
+
+    @classmethod
+    def build(cls):
+        """Build the bank from the static content and the templates"""
+        # Static content first so its IDs don't move when templates change
+        questions = build_questions()
+        return cls(questions + build_templates(len(questions)))
+
+    def __len__(self):
+        return len(self.questions)
+
+    def get(self, qid):
+        """Return the question (or template) with the given ID"""
+        return self.questions[qid]
+
+    def draw(self, rng=random):
+        """Pick a random category, then a random question inside it"""
+        return rng.choice(rng.choice(self.by_category)).draw(rng)
+
+    def draw_from(self, category, rng=random):
+        """Pick a random question from one category (index or name)"""
+        if isinstance(category, str):
+            category = self.categories.index(category)
+        return rng.choice(self.by_category[category]).draw(rng)
+
+
+# Compiled bank layout (little endian):
+#   header:  magic, version, source hash, string count, question count,
+#            category count, accepted-form count
+#   arrays:  string end offsets in the decoded blob (I), category string IDs (I),
+#            questions as (category, question, answer, hint, check, first
+#            accepted, accepted count) string IDs (I x 7), accepted-form string IDs (I)
+#            A question without a check stores the empty string.
+#   blob:    every distinct string, UTF-8, back to back
+CACHE_MAGIC = b"PCEPBANK"
+CACHE_VERSION = 2
+CACHE_HEADER = struct.Struct("<8sH32sIIII")
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__", "pcep_bank.bin")
+
+
+def source_hash():
+    """Hash of the question sources (this file) plus the cache format"""
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read() + bytes([CACHE_VERSION])).digest()
+
+
+def compile_bank(questions, categories=CATEGORIES, path=CACHE_PATH, digest=None):
+    """Serialize static Question records to the compiled binary format"""
+    strings = {}
+
+    def intern(text):
+        sid = strings.get(text)
+        if sid is None:
+            sid = strings[text] = len(strings)
+        return sid
+
+    category_ids = array("I", map(intern, categories))
+    table = array("I")
+    accepted = array("I")
+    for q in questions:
+        forms = sorted(q.accepted)
+        table.extend((q.category, intern(q.question), intern(q.answer), intern(q.hint),
+                      intern(q.check or ""), len(accepted), len(forms)))
+        accepted.extend(map(intern, forms))
+
+    ends = array("I")
+    length = 0
+    for text in strings:
+        length += len(text)
+        ends.append(length)
+    blob = "".join(strings).encode("utf-8")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, digest or source_hash(),
+                                      len(strings), len(questions), len(category_ids), len(accepted)))
+            for part in (ends, category_ids, table, accepted):
+                part.tofile(f)
+            f.write(blob)
+        os.replace(tmp_path, path)
+    finally:
+        # Left behind only if the write failed (e.g. a full disk)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_compiled(path=CACHE_PATH, digest=None):
+    """(categories, questions) from a compiled bank in one read; None if missing, stale or corrupt"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, stored, n_strings, n_questions, n_categories, n_accepted = \
+            CACHE_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or stored != (digest or source_hash()):
+        return None
+    try:
+        return parse_compiled(data, n_strings, n_questions, n_categories, n_accepted)
+    except (ValueError, IndexError):
+        # Truncated or corrupt (UnicodeDecodeError is a ValueError): rebuild
+        return None
+
+
+def parse_compiled(data, n_strings, n_questions, n_categories, n_accepted):
+    """Decode the arrays and strings after a compiled bank's header"""
+    def take(count):
+        nonlocal offset
+        part = array("I")
+        part.frombytes(data[offset:offset + 4 * count])
+        offset += 4 * count
+        return part
+
+    offset = CACHE_HEADER.size
+    if len(data) < offset + 4 * (n_strings + n_categories + 7 * n_questions + n_accepted):
+        raise ValueError("compiled bank is truncated")
+    ends = take(n_strings)
+    category_ids = take(n_categories)
+    table = take(7 * n_questions)
+    accepted_ids = take(n_accepted)
+    if sys.byteorder != "little":
+        for part in (ends, category_ids, table, accepted_ids):
+            part.byteswap()
+
+    blob = data[offset:].decode("utf-8")
+    if len(blob) != (ends[-1] if ends else 0):
+        raise ValueError("compiled bank is truncated")
+    strings = []
+    start = 0
+    for end in ends:
+        strings.append(blob[start:end])
+        start = end
+
+    # Questions with the same answer key share one accepted-forms set
+    forms = {}
+    questions = []
+    rows = iter(table)
+    for qid, (category, question, answer, hint, check, first, count) in enumerate(zip(*[rows] * 7)):
+        if category >= n_categories:
+            raise ValueError(f"compiled question {qid} has no category {category}")
+        accepted = forms.get(answer)
+        if accepted is None:
+            accepted = forms[answer] = frozenset(strings[i] for i in accepted_ids[first:first + count])
+        questions.append(Question(qid, category, strings[question], strings[answer],
+                                  strings[hint], accepted, strings[check] or None))
+    return [strings[i] for i in category_ids], questions
+
+
+def load_bank():
+    """The bank, with static questions from the compiled cache when it is current"""
+    digest = source_hash()
+    compiled = load_compiled(CACHE_PATH, digest)
+    if compiled is None:
+        questions = build_questions()
+        try:
+            compile_bank(questions, CATEGORIES, CACHE_PATH, digest)
+        except OSError:
+            pass  # read-only install: just build every time
+    else:
+        questions = compiled[1]
+    # Templates are code, not data, so they are never cached
+    return QuestionBank(questions + build_templates(len(questions)))
+
+
+QUESTION_BANK = load_bank()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["compile"]:
+        sys.exit("usage: python pcep_questions.py compile")
+    questions = build_questions()
+    compile_bank(questions)
+    print(f"Compiled {len(questions)} questions to {CACHE_PATH}")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+DIFFICULTY RATINGS
+Per-question difficulty and per-learner ability on one logit scale (IRT):
+
+    P(correct) = 1 / (1 + exp(-a * (ability - difficulty)))
+
+where `a` is the question's discrimination (1 until calibrated with 2PL).
+
+Online, every graded answer nudges both ratings Elo-style, in O(1): the
+surprise (correct - P) moves the learner's ability up and the question's
+difficulty down, with step sizes that shrink as evidence builds up.
+Offline, `calibrate` fits a 1PL or 2PL IRT model to every answer in the
+progress store with NumPy (vectorized Newton steps with a weak prior),
+which handles millions of answers in seconds, and saves the result for
+the game to start from.
+
+The "Adaptive" question order picks questions the learner should get
+right about 70% of the time, and the final score is also shown weighted
+by how hard each question was.
+
+Usage:
+    python pcep_rating.py calibrate               # 2PL fit over ~/.pcep_practice.db
+    python pcep_rating.py calibrate --model 1pl
+    python pcep_rating.py show                    # hardest and easiest questions
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import random
+import sys
+import time
+from array import array
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".pcep_ratings.json")
+RATINGS_VERSION = 1
+
+# Elo step sizes: start large, shrink towards the floor as answers accumulate
+LEARNER_K = 0.6
+QUESTION_K = 0.4
+K_FLOOR = 0.05
+# Answers after which the step size has halved
+LEARNER_HALF_LIFE = 20
+QUESTION_HALF_LIFE = 10
+# Chance of success the adaptive order aims for
+TARGET_SUCCESS = 0.7
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+class Ratings:
+    """Question difficulties/discriminations, updated online and saved to `path`"""
+
+    def __init__(self, size, path=None):
+        self.path = path
+        self.difficulty = array("d", bytes(8 * size))
+        self.discrimination = array("d", [1.0]) * size
+        self.answers = array("I", bytes(4 * size))
+        # The local learner's ability, carried from one run to the next
+        self.learner = (0.0, 0)
+        if path and os.path.exists(path):
+            self.load()
+
+    def probability(self, ability, qid):
+        """Chance that a learner of this ability answers the question correctly"""
+        return sigmoid(self.discrimination[qid] * (ability - self.difficulty[qid]))
+
+    def weight(self, qid):
+        """Score weight: 1 / the chance that an average learner gets it right (capped at 5)"""
+        return 1.0 / max(0.2, min(0.95, self.probability(0.0, qid)))
+
+    def update(self, state, qid, correct):
+        """Elo-style update of the learner's ability and the question's difficulty"""
+        surprise = correct - self.probability(state.ability, qid)
+        a = self.discrimination[qid]
+        k = max(K_FLOOR, LEARNER_K / (1 + state.rated / LEARNER_HALF_LIFE))
+        state.ability += k * a * surprise
+        state.rated += 1
+        k = max(K_FLOOR, QUESTION_K / (1 + self.answers[qid] / QUESTION_HALF_LIFE))
+        self.difficulty[qid] -= k * a * surprise
+        self.answers[qid] += 1
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != RATINGS_VERSION:
+            return
+        for qid, (difficulty, discrimination, answers) in enumerate(data["questions"][:len(self.answers)]):
+            self.difficulty[qid] = difficulty
+            self.discrimination[qid] = discrimination
+            self.answers[qid] = answers
+        self.learner = tuple(data.get("learner", (0.0, 0)))
+
+    def save(self, learner=None):
+        """Write ratings (and the local learner's (ability, answers)) atomically"""
+        if not self.path:
+            return
+        if learner is not None:
+            self.learner = learner
+        data = {
+            "version": RATINGS_VERSION,
+            "saved": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "learner": list(self.learner),
+            "questions": [[round(b, 4), round(a, 4), n] for b, a, n
+                          in zip(self.difficulty, self.discrimination, self.answers)],
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+class AdaptivePicker:
+    """Picks questions whose difficulty suits the learner's current ability.
+
+    Questions are kept sorted by difficulty; a pick bisects for the
+    difficulty that gives TARGET_SUCCESS and draws from the `window`
+    questions nearest to it. The sort is refreshed lazily, every
+    `rebuild_every` answers, since difficulties drift slowly.
+    """
+    __slots__ = ("bank", "ratings", "state", "rng", "window", "rebuild_every",
+                 "pending", "keys", "qids", "last")
+
+    def __init__(self, bank, ratings, state, window=8, rebuild_every=None, rng=random):
+        self.bank = bank
+        self.ratings = ratings
+        self.state = state
+        self.rng = rng
+        self.window = window
+        self.rebuild_every = rebuild_every or max(10, len(bank) // 10)
+        self.last = None
+        self.rebuild()
+
+    def rebuild(self):
+        order = sorted(range(len(self.bank)), key=self.ratings.difficulty.__getitem__)
+        self.keys = [self.ratings.difficulty[qid] for qid in order]
+        self.qids = order
+        self.pending = 0
+
+    def pick(self):
+        """A question near the difficulty the learner should get right TARGET_SUCCESS of the time"""
+        if self.pending >= self.rebuild_every:
+            self.rebuild()
+        target = self.state.ability - math.log(TARGET_SUCCESS / (1 - TARGET_SUCCESS))
+        middle = bisect.bisect_left(self.keys, target)
+        low = max(0, middle - self.window)
+        high = min(len(self.qids), max(middle + self.window, low + 2 * self.window))
+        qid = self.qids[self.rng.randrange(low, high)]
+        if qid == self.last and high - low > 1:
+            qid = self.qids[self.rng.randrange(low, high)]
+        self.last = qid
+        return self.bank.get(qid).draw(self.rng)
+
+    def update(self, question, correct):
+        """Ratings are updated by the game; just count towards the next re-sort"""
+        self.pending += 1
+
+
+def load_responses(db_path, bank=None):
+    """(learner index, question ID, correct) arrays from the progress store, plus learner count.
+
+    Only rounds played from `bank` (a progress-store bank name, the
+    built-in bank by default) are read; question IDs are per bank.
+    """
+    import numpy as np
+
+    from pcep_progress import BUILTIN_BANK, connect
+    conn = connect(db_path)
+    learners = {}
+    learner_ids = array("l")
+    question_ids = array("l")
+    correct = array("b")
+    try:
+        rows = conn.execute("SELECT session, question_id, correct FROM answers WHERE bank = ? ORDER BY id",
+                            (bank or BUILTIN_BANK,))
+        for session, qid, right in rows:
+            learner = learners.get(session)
+            if learner is None:
+                learner = learners[session] = len(learners)
+            learner_ids.append(learner)
+            question_ids.append(qid)
+            correct.append(right)
+    finally:
+        conn.close()
+    return (np.frombuffer(learner_ids, dtype=np.int_ if learner_ids.itemsize == 8 else np.int32),
+            np.frombuffer(question_ids, dtype=np.int_ if question_ids.itemsize == 8 else np.int32),
+            np.frombuffer(correct, dtype=np.int8).astype(np.float64),
+            len(learners))
+
+
+def calibrate(learner_ids, question_ids, correct, n_learners, n_questions, model="2pl",
+              iterations=50, tolerance=0.01, prior=1.0):
+    """Fit IRT parameters by joint MAP estimation.
+
+    Every iteration takes one Newton step for all abilities, then all
+    difficulties (and, for 2PL, all discriminations), each a handful of
+    vectorized passes over the responses; it stops once no question
+    parameter moves by more than `tolerance`. A N(0, prior^2) prior keeps learners
+    and questions with all-right or all-wrong answers finite. For 2PL,
+    abilities are rescaled to mean 0 and standard deviation 1 after each
+    step (with difficulties and discriminations adjusted to match), since
+    the scale would otherwise drift.
+    Returns (abilities, difficulties, discriminations, answers per question).
+    """
+    import numpy as np
+
+    theta = np.zeros(n_learners)
+    b = np.zeros(n_questions)
+    a = np.ones(n_questions)
+    precision = 1.0 / prior ** 2
+    answers = np.bincount(question_ids, minlength=n_questions)
+
+    def step(index, size, gradient, curvature, values, centre=0.0):
+        """Newton step for every parameter at once: sums per parameter via bincount"""
+        g = np.bincount(index, gradient, minlength=size) - precision * (values - centre)
+        h = np.bincount(index, curvature, minlength=size) + precision
+        return g / h
+
+    for _ in range(iterations):
+        previous_a, previous_b = a, b.copy()
+        ai = a[question_ids]
+        bi = b[question_ids]
+        p = 1.0 / (1.0 + np.exp(-ai * (theta[learner_ids] - bi)))
+        theta += step(learner_ids, n_learners, ai * (correct - p), ai * ai * p * (1.0 - p), theta)
+
+        thetai = theta[learner_ids]
+        p = 1.0 / (1.0 + np.exp(-ai * (thetai - bi)))
+        b += step(question_ids, n_questions, -ai * (correct - p), ai * ai * p * (1.0 - p), b)
+
+        if model == "2pl":
+            spread = thetai - b[question_ids]
+            p = 1.0 / (1.0 + np.exp(-ai * spread))
+            a = a + step(question_ids, n_questions, spread * (correct - p),
+                         spread * spread * p * (1.0 - p), a, centre=1.0)
+            mean, sd = theta.mean(), theta.std()
+            if sd > 0:
+                theta = (theta - mean) / sd
+                b = (b - mean) / sd
+                a = a * sd
+            a = np.clip(a, 0.25, 4.0)
+        if max(np.abs(b - previous_b).max(), np.abs(a - previous_a).max()) < tolerance:
+            break
+    return theta, b, a, answers
+
+
+def run_calibration(db_path, ratings, model="2pl", iterations=50):
+    """Fit over the store and write the result into `ratings`; returns the response count"""
+    learner_ids, question_ids, correct, n_learners = load_responses(db_path)
+    if not len(correct):
+        return 0
+    size = len(ratings.answers)
+    keep = question_ids < size  # answers to questions no longer in the bank
+    theta, b, a, answers = calibrate(learner_ids[keep], question_ids[keep], correct[keep],
+                                     n_learners, size, model, iterations)
+    for qid in range(size):
+        if answers[qid]:
+            ratings.difficulty[qid] = float(b[qid])
+            ratings.discrimination[qid] = float(a[qid])
+            ratings.answers[qid] = int(answers[qid])
+    # The newest session is the best estimate of the learner now
+    ratings.learner = (float(theta[learner_ids[-1]]), int((learner_ids == learner_ids[-1]).sum()))
+    return int(keep.sum())
+
+
+def main(argv=None):
+    from pcep_progress import DEFAULT_DB
+    from pcep_questions import QUESTION_BANK
+
+    parser = argparse.ArgumentParser(description="Question difficulty ratings")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit = commands.add_parser("calibrate", help="fit an IRT model over all logged answers (needs NumPy)")
+    fit.add_argument("--db", default=DEFAULT_DB, help="progress store to read")
+    fit.add_argument("--model", choices=("1pl", "2pl"), default="2pl")
+    fit.add_argument("--iterations", type=int, default=50)
+    show = commands.add_parser("show", help="list the hardest and easiest questions")
+    show.add_argument("--count", type=int, default=10)
+    parser.add_argument("--ratings", default=DEFAULT_PATH, help="ratings file")
+    args = parser.parse_args(argv)
+
+    ratings = Ratings(len(QUESTION_BANK), args.ratings)
+    if args.command == "calibrate":
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            print("Calibration needs NumPy: pip install numpy")
+            return 1
+        started = time.perf_counter()
+        count = run_calibration(args.db, ratings, args.model, args.iterations)
+        if not count:
+            print("No answers logged yet; nothing to calibrate.")
+            return 1
+        ratings.save()
+        print(f"Fitted {args.model.upper()} over {count:,} answers in "
+              f"{time.perf_counter() - started:.2f}s; saved to {args.ratings}")
+        return 0
+
+    order = sorted(range(len(ratings.answers)), key=ratings.difficulty.__getitem__)
+    for title, qids in (("Hardest", order[::-1][:args.count]), ("Easiest", order[:args.count])):
+        print(f"\n{title}:")
+        for qid in qids:
+            record = QUESTION_BANK.get(qid)
+            text = getattr(record, "question", None) or record.text
+            print(f"  {ratings.difficulty[qid]:+6.2f}  a={ratings.discrimination[qid]:.2f}  "
+                  f"n={ratings.answers[qid]:<6} {text.splitlines()[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
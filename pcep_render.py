@@ -0,0 +1,143 @@
+"""
+TERMINAL RENDERER
+Composes each screen in memory and sends it to the terminal in one write.
+
+On an ANSI terminal, a new screen is drawn over the previous one and only
+the lines that changed are rewritten (e.g. just the score/streak header),
+which avoids flicker on slow SSH links and serial consoles. Anywhere else
+(pipes, files, TERM=dumb) output is written plainly, one write per flush.
+"""
+
+import os
+import shutil
+import sys
+
+HOME = "\x1b[H"
+CLEAR_ALL = "\x1b[2J"
+CLEAR_BELOW = "\x1b[J"
+CLEAR_LINE = "\r\x1b[2K"
+
+
+def supports_ansi(stream):
+    """True for an interactive terminal that understands cursor movement"""
+    isatty = getattr(stream, "isatty", None)
+    return bool(isatty and isatty()) and os.environ.get("TERM", "") not in ("", "dumb")
+
+
+class Renderer:
+    """print()/input() replacement that buffers and redraws by diff"""
+
+    def __init__(self, stream=None, diff=None):
+        # With no stream given, sys.stdout is looked up at write time so
+        # redirect_stdout() keeps working
+        self._stream = stream
+        self.diff = supports_ansi(self.stream) if diff is None else diff
+        self.buffer = []
+        self.screen = []       # lines written on the current screen so far
+        self.previous = None   # lines of the last screen (None = unknown)
+        self.tail = ""         # unfinished last line (e.g. an input prompt)
+        self.fresh = True      # next flush starts a new screen
+        self.frames = 0
+        self.writes = 0
+        self.bytes = 0
+        self.frame_writes = 0
+        self.frame_bytes = 0
+
+    @property
+    def stream(self):
+        return self._stream or sys.stdout
+
+    def print(self, *values, sep=" ", end="\n"):
+        """Same signature as print(); nothing is written until flush()"""
+        self.buffer.append(sep.join(map(str, values)) + end)
+
+    def input(self, prompt=""):
+        """Flush the screen with the prompt on it, then read a line"""
+        if prompt:
+            self.print(prompt, end="")
+        self.flush()
+        answer = input()
+        # The terminal echoed the answer and a newline after the prompt
+        self.screen.append(self.tail + answer)
+        self.tail = ""
+        return answer
+
+    def new_frame(self):
+        """Start composing a new screen"""
+        self.flush()
+        if self.diff:
+            rows = shutil.get_terminal_size().lines
+            # A screen that scrolled can't be diffed against; redraw fully
+            self.previous = self.screen if len(self.screen) < rows else None
+        else:
+            self.buffer.append("\n" * 2)
+        self.screen = []
+        self.fresh = True
+        self.frames += 1
+        self.frame_writes = 0
+        self.frame_bytes = 0
+
+    def flush(self):
+        """Send everything buffered in a single write"""
+        if not self.buffer:
+            return
+        text = "".join(self.buffer)
+        self.buffer.clear()
+        if self.diff:
+            text = self.compose_diff(text)
+        self.stream.write(text)
+        self.stream.flush()
+        size = len(text.encode("utf-8", "replace"))
+        self.writes += 1
+        self.bytes += size
+        self.frame_writes += 1
+        self.frame_bytes += size
+
+    def compose_diff(self, text):
+        """Escape sequences that turn what is on screen into the new lines"""
+        out = []
+        if self.fresh:
+            self.fresh = False
+            if self.previous is None:
+                out.append(HOME + CLEAR_ALL)
+                self.previous = []
+            else:
+                out.append(HOME)
+        lines = (self.tail + text).split("\n")
+        if self.tail:
+            out.append("\r")
+        self.tail = lines.pop()
+        columns = shutil.get_terminal_size().columns
+        skipped = 0
+        for line in lines:
+            row = len(self.screen)
+            if row < len(self.previous) and self.previous[row] == line:
+                skipped += 1
+            else:
+                if skipped:
+                    out.append(f"\x1b[{skipped}B")
+                    skipped = 0
+                out.append(CLEAR_LINE + line + "\n")
+            self.screen.append(line)
+            if len(line) + 4 > columns:
+                # Wrapped lines throw off row counting for the next diff
+                self.screen.append(None)
+        if skipped:
+            out.append(f"\x1b[{skipped}B")
+        # Old lines below the cursor are gone now
+        out.append(CLEAR_BELOW + self.tail)
+        del self.previous[len(self.screen):]
+        return "".join(out)
+
+    def stats(self):
+        """Write/byte counters, overall and for the current frame"""
+        frames = max(self.frames, 1)
+        return {
+            "frames": self.frames,
+            "writes": self.writes,
+            "bytes": self.bytes,
+            "writes_per_frame": self.writes / frames,
+            "bytes_per_frame": self.bytes / frames,
+            "frame_writes": self.frame_writes,
+            "frame_bytes": self.frame_bytes,
+        }
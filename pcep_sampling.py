@@ -0,0 +1,148 @@
+"""
+QUESTION SAMPLING
+Weighted category sampling for the "focus on weaknesses" question order,
+and shuffled decks that deal every question before repeating any.
+"""
+
+import random
+from array import array
+
+# How fast a category's error rate follows recent answers (0-1)
+ERROR_RATE_DECAY = 0.2
+# Every category keeps at least this weight so none disappears completely
+MIN_WEIGHT = 0.05
+
+
+class AliasTable:
+    """Vose alias table: O(n) to build, O(1) per weighted draw"""
+    __slots__ = ("prob", "alias")
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        self.prob = array("d", [1.0] * n)
+        self.alias = array("l", range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left over is 1.0 up to rounding error
+
+    def sample(self, rng=random):
+        """Draw one index; a single random number picks both column and side"""
+        u = rng.random() * len(self.prob)
+        column = int(u)
+        return column if u - column < self.prob[column] else self.alias[column]
+
+
+class WeaknessPicker:
+    """Picks categories in proportion to their recent error rate.
+
+    Error rates are exponentially weighted, so they follow the learner's
+    recent answers. The alias table is rebuilt lazily, at most once every
+    `rebuild_every` graded answers, which keeps the O(n) build amortized to
+    O(1) per round while every draw stays O(1).
+    """
+    __slots__ = ("bank", "rng", "error_rates", "table", "rebuild_every", "pending")
+
+    def __init__(self, bank, correct=None, total=None, rebuild_every=None, rng=random):
+        self.bank = bank
+        self.rng = rng
+        categories = len(bank.by_category)
+        correct = correct or [0] * categories
+        total = total or [0] * categories
+        # Seed from any history we already have (with a 1/2 prior)
+        self.error_rates = array("d", ((t - c + 1) / (t + 2) for c, t in zip(correct, total)))
+        self.rebuild_every = rebuild_every or categories
+        self.pending = 0
+        self.table = AliasTable(self.weights())
+
+    def weights(self):
+        """Current sampling weight of each category (empty ones get none)"""
+        return [max(rate, MIN_WEIGHT) if bucket else 0.0
+                for rate, bucket in zip(self.error_rates, self.bank.by_category)]
+
+    def pick(self):
+        """A question from a category drawn by weakness"""
+        if self.pending >= self.rebuild_every:
+            self.table = AliasTable(self.weights())
+            self.pending = 0
+        return self.bank.draw_from(self.table.sample(self.rng), self.rng)
+
+    def update(self, question, correct):
+        """Fold one graded answer into its category's error rate"""
+        rate = self.error_rates[question.category]
+        self.error_rates[question.category] = rate + ERROR_RATE_DECAY * ((not correct) - rate)
+        self.pending += 1
+
+
+class DeckPicker:
+    """Deals every question once, in shuffled order, before any repeats.
+
+    The deck is one array of question IDs shuffled lazily (Fisher-Yates one
+    swap per draw), so dealing is O(1) and a session costs 2 bytes per
+    question (4 for banks of 64k questions or more). A stratified deck
+    keeps each category in its own slice of the array and deals the
+    categories in turn, so every category comes up equally often however
+    many questions it has. A category that runs out is reshuffled on its
+    own. `ids` limits the deck to some questions (e.g. the matches of a
+    drill search).
+    """
+    __slots__ = ("bank", "rng", "ids", "starts", "left", "order", "turn")
+
+    def __init__(self, bank, stratified=False, rng=random, ids=None):
+        self.bank = bank
+        self.rng = rng
+        typecode = "H" if len(bank) <= 0xFFFF else "I"
+        if stratified:
+            # Category slices, back to back: [start, start + size)
+            self.ids = array(typecode)
+            self.starts = array("I")
+            wanted = None if ids is None else set(ids)
+            for bucket in bank.by_category:
+                self.starts.append(len(self.ids))
+                # Pack categories know their IDs; don't load every question for them
+                members = getattr(bucket, "ids", None)
+                if members is None:
+                    members = (question.qid for question in bucket)
+                self.ids.extend(members if wanted is None else (qid for qid in members if qid in wanted))
+            self.starts.append(len(self.ids))
+            # Turn order over the non-empty categories, reshuffled every lap
+            self.order = array("I", (i for i, (start, end) in enumerate(zip(self.starts, self.starts[1:]))
+                                     if end > start))
+        else:
+            self.ids = array(typecode, range(len(bank)) if ids is None else ids)
+            self.starts = array("I", (0, len(self.ids)))
+            self.order = array("I", [0])
+        self.left = array("I", (end - start for start, end in zip(self.starts, self.starts[1:])))
+        self.turn = len(self.order)
+
+    def deal(self, slot):
+        """Next ID from one slice: swap a random undealt ID to the end of the undealt part"""
+        start = self.starts[slot]
+        left = self.left[slot] or self.starts[slot + 1] - start
+        j = start + self.rng.randrange(left)
+        left -= 1
+        last = start + left
+        ids = self.ids
+        ids[j], ids[last] = ids[last], ids[j]
+        self.left[slot] = left
+        return ids[last]
+
+    def pick(self):
+        """The next question in the deck"""
+        if self.turn == len(self.order):
+            if len(self.order) > 1:
+                self.rng.shuffle(self.order)
+            self.turn = 0
+        slot = self.order[self.turn]
+        self.turn += 1
+        return self.bank.get(self.deal(slot)).draw(self.rng)
+
+    def update(self, question, correct):
+        """Dealing order doesn't depend on answers"""
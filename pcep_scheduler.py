@@ -0,0 +1,75 @@
+"""
+SPACED REPETITION SCHEDULER
+Leitner-box scheduling of question IDs with a due-time priority queue.
+
+Time is measured in answered rounds (the learner's own clock), so the same
+sequence of answers always produces the same schedule.
+"""
+
+import heapq
+import random
+from array import array
+
+# Review interval, in rounds, for each Leitner box
+INTERVALS = (1, 3, 7, 15, 31, 63)
+
+# Heap entries pack (due, qid) into one int so they sort by due time
+ID_BITS = 20
+ID_MASK = (1 << ID_BITS) - 1
+
+
+class LeitnerScheduler:
+    """Picks the question that is due soonest; moves it between boxes on grading.
+
+    Per-learner state is five bytes per question (its box and due time)
+    plus the heap, so thousands of learners fit comfortably in one process.
+    Rescheduling a question that isn't at the top of the heap pushes a new
+    entry and leaves the old one to be dropped when it surfaces; an entry
+    is live only while its due time matches the question's.
+    """
+    __slots__ = ("bank", "rng", "clock", "boxes", "due", "heap")
+
+    def __init__(self, bank, rng=random):
+        if len(bank) > ID_MASK:
+            raise ValueError(f"bank too large for scheduler ({len(bank)} questions)")
+        self.bank = bank
+        self.rng = rng
+        self.clock = 0
+        self.boxes = bytearray(len(bank))
+        # New questions are introduced one per round, in shuffled order.
+        # A list with ascending keys is already a valid heap.
+        order = list(range(len(bank)))
+        rng.shuffle(order)
+        self.due = array("I", bytes(4 * len(bank)))
+        for due, qid in enumerate(order):
+            self.due[qid] = due
+        self.heap = [due << ID_BITS | qid for due, qid in enumerate(order)]
+
+    def top(self):
+        """The live heap entry that is due soonest, dropping stale ones above it"""
+        heap = self.heap
+        while heap[0] >> ID_BITS != self.due[heap[0] & ID_MASK]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def pick(self):
+        """The question that is due soonest"""
+        return self.bank.get(self.top() & ID_MASK).draw(self.rng)
+
+    def update(self, question, correct):
+        """Move the question up a box (or back to the first) and reschedule it"""
+        qid = question.qid
+        self.clock += 1
+        box = min(self.boxes[qid] + 1, len(INTERVALS) - 1) if correct else 0
+        self.boxes[qid] = box
+        due = self.clock + INTERVALS[box]
+        if self.top() & ID_MASK == qid:
+            heapq.heapreplace(self.heap, due << ID_BITS | qid)
+        elif due != self.due[qid]:
+            # Graded a question we didn't pick: its old entry goes stale
+            heapq.heappush(self.heap, due << ID_BITS | qid)
+        self.due[qid] = due
+        if len(self.heap) > 2 * len(self.due):
+            # Mostly stale entries: rebuild from the live due times
+            self.heap = [due << ID_BITS | qid for qid, due in enumerate(self.due)]
+            heapq.heapify(self.heap)
@@ -0,0 +1,131 @@
+"""
+QUESTION SEARCH
+An inverted index from tokens to question IDs, for topic and keyword
+drills ("slicing", "pop", "KeyError").
+
+Questions are indexed by the words of their text, hint and answer key,
+their category name, and a few concepts spotted in code (slicing, loops,
+comparisons). A query is terms joined by AND (the default between terms)
+and OR, with AND binding tighter. The operators are upper case, since
+"and" and "or" are Python keywords worth searching for:
+
+    pop                      questions mentioning pop
+    slicing negative         both words
+    KeyError OR IndexError   either one
+    dict get OR list pop     (dict AND get) OR (list AND pop)
+
+AND intersects posting sets smallest first, so a lookup costs about the
+size of the rarest term's postings, not the size of the bank. add(),
+remove() and update() keep the index current as questions change.
+"""
+
+import re
+
+from pcep_questions import QuestionTemplate
+
+TOKEN = re.compile(r"[a-z_][a-z0-9_]*|\d+")
+
+# Concepts that show up as syntax rather than words
+CONCEPTS = (
+    ("slice", re.compile(r"\[[^\]\n]*:[^\]\n]*\]")),
+    ("index", re.compile(r"\w\[-?\w+\]")),
+    ("negative", re.compile(r"\[-\d")),
+    ("loop", re.compile(r"\b(?:for|while)\b")),
+    ("comparison", re.compile(r"==|!=|<=|>=|(?<![-=])>|<")),
+)
+
+# Query words that mean the same as an indexed token
+ALIASES = {
+    "slicing": "slice", "slices": "slice", "sliced": "slice",
+    "indexing": "index", "indexes": "index", "indices": "index",
+    "loops": "loop", "looping": "loop",
+    "comparisons": "comparison", "compare": "comparison",
+    "exceptions": "exception", "errors": "error",
+    "dictionary": "dict", "dictionaries": "dict", "lists": "list",
+    "strings": "string", "str": "string", "tuples": "tuple",
+    "functions": "function", "def": "function",
+}
+
+
+def tokenize(text):
+    """Lower-case words and numbers of a piece of text"""
+    return TOKEN.findall(text.lower())
+
+
+def normalize_token(token):
+    token = token.lower()
+    return ALIASES.get(token, token)
+
+
+class SearchIndex:
+    """token -> set of question IDs, plus each question's tokens for updates"""
+
+    def __init__(self, categories):
+        self.categories = tuple(categories)
+        self.postings = {}
+        self.tokens = {}  # qid -> frozenset of its tokens
+
+    @classmethod
+    def build(cls, bank):
+        """Index every question (and template) in a bank"""
+        index = cls(bank.categories)
+        for qid in range(len(bank)):
+            index.add(bank.get(qid))
+        return index
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def record_tokens(self, record):
+        """Everything a question can be found by"""
+        if isinstance(record, QuestionTemplate):
+            # Parameters are unknown until rendering: index the fixed words,
+            # and spot concepts with a stand-in value for every parameter
+            parts = (re.sub(r"\{\d+\}", " ", record.text), record.hint)
+            text = record.text.format(*["0"] * len(record.names))
+        else:
+            text = record.question
+            parts = (text, record.hint, record.answer)
+        tokens = set()
+        for part in parts:
+            tokens.update(normalize_token(token) for token in tokenize(part))
+        category = self.categories[record.category]
+        tokens.add(category)
+        tokens.update(normalize_token(word) for word in category.split("_"))
+        tokens.update(name for name, pattern in CONCEPTS if pattern.search(text))
+        return frozenset(tokens)
+
+    def add(self, record):
+        """Index a new question (or re-index one that changed)"""
+        if record.qid in self.tokens:
+            self.remove(record.qid)
+        tokens = self.record_tokens(record)
+        self.tokens[record.qid] = tokens
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+            posting.add(record.qid)
+
+    update = add
+
+    def remove(self, qid):
+        """Drop a question from the index"""
+        for token in self.tokens.pop(qid, ()):
+            posting = self.postings[token]
+            posting.discard(qid)
+            if not posting:
+                del self.postings[token]
+
+    def search(self, query):
+        """Set of question IDs matching a query (see the module docstring)"""
+        matches = set()
+        for group in re.split(r"\bOR\b", query):
+            terms = [normalize_token(term) for term in tokenize(re.sub(r"\bAND\b", " ", group))]
+            if not terms:
+                continue
+            postings = sorted((self.postings.get(term, ()) for term in terms), key=len)
+            if not postings[0]:
+                continue
+            matches |= postings[0].intersection(*postings[1:])
+        return matches
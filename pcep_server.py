@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+PRACTICE SERVER
+The practice game as a local HTTP JSON API (asyncio, standard library only).
+
+    POST /session                 {"order": "Balanced Deck", "name": "ada"} (both optional)
+                                  -> {"session": id}
+    GET  /session/{id}/question   -> the current question (same one until answered)
+    POST /session/{id}/answer     {"answer": "..."} -> grade, correct answer, score
+    GET  /session/{id}/stats      -> score, streaks, per-category counts, leaderboard ranks
+    GET  /leaderboard?metric=accuracy&category=indexing&k=10
+                                  -> top k (metric: best_streak, accuracy, answered)
+
+Connections are kept alive (HTTP/1.1). At most --max-connections are
+served at once; further connections wait until one closes. All sessions
+share one game engine and question bank; each session is a compact
+SessionState, and beyond --max-sessions the least recently used ones are
+dropped. Every session is rated: question difficulties are pooled across
+sessions, while each session keeps its own ability.
+
+Usage:
+    python pcep_server.py --port 8765
+    python pcep_loadgen.py --port 8765      # measure requests/sec
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import signal
+import sys
+import traceback
+from urllib.parse import parse_qs
+
+from pcep_leaderboard import METRICS, Leaderboards
+from pcep_practive_game import QUESTION_ORDERS, PythonPracticeGame
+from pcep_questions import QUESTION_BANK
+from pcep_rating import Ratings
+from pcep_render import Renderer
+from pcep_session import SessionManager
+
+MAX_BODY = 64 * 1024
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """An error response: status code and message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PracticeServer:
+    """Sessions plus the request handling for the JSON API"""
+
+    def __init__(self, bank=None, max_sessions=10_000, max_connections=256, leaderboards=None):
+        # The engine's screen is never written to; only the game logic is used.
+        # Ratings are on from the start, so an "Adaptive" session never switches
+        # them on for sessions that are already running
+        bank = QUESTION_BANK if bank is None else bank
+        self.game = PythonPracticeGame(bank=bank, screen=Renderer(io.StringIO(), diff=False),
+                                       ratings=Ratings(len(bank)))
+        self.leaderboards = self.game.leaderboards = (
+            leaderboards or Leaderboards(self.game.bank.categories))
+        self.sessions = SessionManager(self.game, max_sessions)
+        self.connections = asyncio.Semaphore(max_connections)
+        self.requests = 0
+
+    # --- API -----------------------------------------------------------
+
+    def create_session(self, body):
+        order = body.get("order")
+        if order is not None and not isinstance(order, str):
+            raise HTTPError(400, "order must be a string")
+        if order is not None and order not in QUESTION_ORDERS:
+            raise HTTPError(400, f"unknown order {order!r}; choose from {list(QUESTION_ORDERS)}")
+        name = body.get("name")
+        if name is not None and not (isinstance(name, str) and 0 < len(name) <= 64):
+            raise HTTPError(400, "name must be a string of 1-64 characters")
+        state = self.sessions.create(order, name)
+        return 201, {"session": state.session_id, "order": state.question_order}
+
+    def session(self, session_id):
+        """The engine, switched to this session's state"""
+        if self.sessions.get(session_id) is None:
+            raise HTTPError(404, "no such session")
+        return self.game
+
+    def question(self, session_id):
+        game = self.session(session_id)
+        q_data = game.state.pending
+        if q_data is None:
+            q_data = game.state.pending = game.get_random_question()
+        return 200, {
+            "number": game.total_questions + 1,
+            "qid": q_data.qid,
+            "category": game.bank.categories[q_data.category],
+            "question": q_data.question,
+        }
+
+    def answer(self, session_id, body):
+        game = self.session(session_id)
+        q_data = game.state.pending
+        if q_data is None:
+            raise HTTPError(409, "no question asked; GET the question first")
+        answer = body.get("answer")
+        if not isinstance(answer, str):
+            raise HTTPError(400, 'expected {"answer": "..."}')
+        response_ms = body.get("response_ms")
+        if response_ms is not None and not (type(response_ms) is int and response_ms >= 0):
+            raise HTTPError(400, "response_ms must be a whole number of milliseconds")
+        game.state.pending = None
+        correct = game.record_answer(q_data, answer, response_ms)
+        return 200, {
+            "correct": correct,
+            "answer": q_data.answer,
+            "hint": q_data.hint,
+            "score": game.score,
+            "total": game.total_questions,
+            "streak": game.streak,
+        }
+
+    def stats(self, session_id):
+        game = self.session(session_id)
+        return 200, {
+            "score": game.score,
+            "total": game.total_questions,
+            "accuracy": game.score / game.total_questions if game.total_questions else None,
+            "streak": game.streak,
+            "best_streak": game.best_streak,
+            "mistakes": len(game.mistakes or ()),
+            "categories": {
+                name: {"correct": game.category_correct[i], "total": game.category_total[i]}
+                for i, name in enumerate(game.bank.categories) if game.category_total[i]
+            },
+            "ranks": {
+                metric: dict(zip(("rank", "of"), self.leaderboards.rank(
+                    game.state.player or session_id, metric)))
+                for metric in METRICS
+            },
+        }
+
+    def leaderboard(self, query):
+        metric = query.get("metric", "best_streak")
+        category = query.get("category")
+        if metric not in METRICS:
+            raise HTTPError(400, f"metric must be one of {list(METRICS)}")
+        if category is not None and category not in self.leaderboards.categories:
+            raise HTTPError(404, f"no category {category!r}")
+        k = query.get("k", "10")
+        k = min(int(k), 100) if k.isdigit() else 10
+        rows = self.leaderboards.top(metric, k, category)
+        return 200, {"metric": metric, "category": category,
+                     "top": [{"rank": rank, "name": player, "value": value}
+                             for rank, player, value in rows]}
+
+    def dispatch(self, method, path, body):
+        """(status, payload) for one request"""
+        path, _, query = path.partition("?")
+        parts = path.strip("/").split("/")
+        if parts == ["leaderboard"]:
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            return self.leaderboard({key: values[-1] for key, values in parse_qs(query).items()})
+        if parts == ["session"]:
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            return self.create_session(body)
+        if len(parts) == 3 and parts[0] == "session":
+            _, session_id, action = parts
+            routes = {("GET", "question"): lambda: self.question(session_id),
+                      ("POST", "answer"): lambda: self.answer(session_id, body),
+                      ("GET", "stats"): lambda: self.stats(session_id)}
+            handler = routes.get((method, action))
+            if handler is not None:
+                return handler()
+            if any(name == action for _, name in routes):
+                raise HTTPError(405, f"wrong method for {action}")
+        raise HTTPError(404, "not found")
+
+    # --- HTTP ----------------------------------------------------------
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client is done"""
+        async with self.connections:
+            try:
+                while await self.handle_request(reader, writer):
+                    pass
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+    async def handle_request(self, reader, writer):
+        """Read, answer and write one request; False when the connection should close"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as exc:
+            if exc.partial:
+                raise
+            return False  # client closed between requests
+        except asyncio.LimitOverrunError:
+            await self.respond(writer, 413, {"error": "headers too large"}, keep_alive=False)
+            return False
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ")
+        except ValueError:
+            await self.respond(writer, 400, {"error": "bad request line"}, keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        length = headers.get("content-length", "0")
+        length = int(length) if length.isdigit() else -1
+        if not 0 <= length <= MAX_BODY:
+            await self.respond(writer, 413, {"error": "body too large"}, keep_alive=False)
+            return False
+        raw = await reader.readexactly(length) if length else b""
+
+        self.requests += 1
+        try:
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                raise HTTPError(400, "body is not valid JSON") from None
+            if not isinstance(body, dict):
+                raise HTTPError(400, "body must be a JSON object")
+            status, payload = self.dispatch(method, path, body)
+        except HTTPError as exc:
+            status, payload = exc.status, {"error": str(exc)}
+        except Exception:
+            # A bug in a handler: answer anyway, and keep the traceback for the log
+            traceback.print_exc()
+            status, payload = 500, {"error": "internal server error"}
+        await self.respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    async def respond(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        # Stop cleanly on SIGTERM too, so the leaderboards get saved
+        with contextlib.suppress(NotImplementedError):  # no signal handlers on Windows
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+        async with server:
+            print(f"🌐 Serving the practice game on http://{host}:{port}")
+            with contextlib.suppress(asyncio.CancelledError):
+                await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the practice game as a JSON API")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default 8765)")
+    parser.add_argument("--pack", help="serve the questions from a JSONL question pack")
+    parser.add_argument("--max-connections", type=int, default=256,
+                        help="connections served at once (default 256)")
+    parser.add_argument("--max-sessions", type=int, default=10_000,
+                        help="sessions kept; the least recently used go first (default 10000)")
+    parser.add_argument("--leaderboards", help="snapshot file that keeps leaderboards across restarts")
+    args = parser.parse_args(argv)
+
+    bank = None
+    if args.pack:
+        from pcep_packs import PackBank
+        bank = PackBank(args.pack)
+    leaderboards = Leaderboards((bank or QUESTION_BANK).categories, args.leaderboards)
+    server = PracticeServer(bank, args.max_sessions, args.max_connections, leaderboards)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"\n👋 Served {server.requests} requests")
+    finally:
+        leaderboards.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+SESSIONS
+Per-learner state, kept apart from the game engine and the question bank
+so one process can hold many learners.
+
+A SessionState is a slotted record with array-backed per-category counts;
+a new session costs a few hundred bytes plus its question order's picker.
+The mistake log is only created with the first mistake. SessionManager
+keeps the most recently used sessions up to a fixed count and evicts the
+rest; an evicted anonymous session's leaderboard entry goes with it.
+"""
+
+import uuid
+from array import array
+from collections import OrderedDict
+
+
+class SessionState:
+    """Everything that belongs to one learner's session"""
+    __slots__ = ("session_id", "player", "score", "total_questions", "streak", "best_streak",
+                 "category_correct", "category_total", "mistakes", "picker",
+                 "question_order", "pending", "ability", "rated", "weighted_score",
+                 "weighted_total")
+
+    def __init__(self, categories, session_id=None, player=None):
+        self.session_id = session_id or uuid.uuid4().hex
+        # Leaderboard name; the session ID stands in when there is none
+        self.player = player
+        self.score = 0
+        self.total_questions = 0
+        self.streak = 0
+        self.best_streak = 0
+        # Per-category answer counts, kept across games like best_streak
+        zeros = bytes(4 * categories)
+        self.category_correct = array("I", zeros)
+        self.category_total = array("I", zeros)
+        # MistakeLog, created on the first mistake
+        self.mistakes = None
+        # Optional object with pick() / update(question, correct) that
+        # replaces uniform random draws (see QUESTION_ORDERS)
+        self.picker = None
+        self.question_order = "Random"
+        # Question asked but not answered yet (HTTP sessions)
+        self.pending = None
+        # Rating on the question difficulty scale and answers it is based on
+        # (see pcep_rating), and this game's difficulty-weighted score
+        self.ability = 0.0
+        self.rated = 0
+        self.weighted_score = 0.0
+        self.weighted_total = 0.0
+
+    def __repr__(self):
+        return f"SessionState({self.session_id}, {self.score}/{self.total_questions})"
+
+
+class SessionManager:
+    """Sessions by ID, evicting the least recently used beyond `capacity`.
+
+    All sessions share one engine (a PythonPracticeGame) and its bank; the
+    engine is pointed at a session's state before it works on it.
+    """
+
+    def __init__(self, engine, capacity=10_000, order=None):
+        self.engine = engine
+        self.capacity = capacity
+        self.order = order or engine.question_order
+        self.sessions = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def create(self, order=None, player=None):
+        """Start a new session with the given question order (default: self.order)"""
+        state = SessionState(len(self.engine.bank.categories), player=player)
+        self.engine.state = state
+        self.engine.set_question_order(order or self.order)
+        self.sessions[state.session_id] = state
+        if len(self.sessions) > self.capacity:
+            _, evicted = self.sessions.popitem(last=False)
+            self.evicted += 1
+            leaderboards = self.engine.leaderboards
+            if leaderboards is not None and evicted.player is None:
+                # Ranked under its session ID, which can never answer again
+                leaderboards.remove(evicted.session_id)
+        return state
+
+    def get(self, session_id):
+        """The session with this ID (now the most recently used), or None"""
+        state = self.sessions.get(session_id)
+        if state is not None:
+            self.sessions.move_to_end(session_id)
+            self.engine.state = state
+        return state
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+ANSWER-KEY VERIFIER
+Runs every question's `check` snippet and confirms that the stored answer
+really is what Python produces (or the exception it raises), so a typo in
+the bank or in a pack can't teach the wrong thing.
+
+Snippets run in a pool of worker processes, one per core by default. Each
+worker has a memory limit and every snippet a time limit, and snippets only
+see a small set of harmless builtins. That keeps a bad snippet from hanging
+or swamping the run; it is not a sandbox for untrusted code.
+
+Usage:
+    python pcep_verify.py                        # built-in bank and templates
+    python pcep_verify.py --pack my_pack.jsonl   # a question pack
+    python pcep_verify.py --samples 200          # more variants per template
+"""
+
+import argparse
+import ast
+import builtins
+import os
+import random
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from pcep_questions import QUESTION_BANK, QuestionTemplate, normalize_answer
+
+try:
+    import resource
+except ImportError:  # Windows: no memory limit
+    resource = None
+
+SAFE_BUILTINS = {
+    name: getattr(builtins, name) for name in (
+        "abs", "all", "any", "bool", "chr", "dict", "divmod", "enumerate", "filter",
+        "float", "frozenset", "int", "isinstance", "len", "list", "map", "max", "min",
+        "ord", "pow", "range", "repr", "reversed", "round", "set", "sorted", "str",
+        "sum", "tuple", "type", "zip", "None", "True", "False",
+    )
+}
+# Every built-in exception, so snippets can raise and catch them by name
+SAFE_BUILTINS.update((name, value) for name, value in vars(builtins).items()
+                     if isinstance(value, type) and issubclass(value, BaseException))
+# Snippets may print, but nothing should reach the report
+SAFE_BUILTINS["print"] = lambda *args, **kwargs: None
+
+
+class CheckTimeout(BaseException):
+    """Raised in a worker when a snippet runs past its time limit"""
+
+
+def _on_alarm(signum, frame):
+    raise CheckTimeout()
+
+
+def init_worker(memory_mb):
+    """Pool initializer: cap the worker's address space and arm the timer handler"""
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+
+
+def run_check(code, timeout=1.0):
+    """("value", text), ("raised", exception name) or ("timeout"/"error", detail)"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as exc:
+        return "error", f"SyntaxError: {exc.msg}"
+    last = None
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last = ast.Expression(tree.body.pop().value)
+    namespace = {"__builtins__": SAFE_BUILTINS}
+    timed = hasattr(signal, "setitimer")
+    if timed:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        exec(compile(tree, "<check>", "exec"), namespace)
+        value = eval(compile(last, "<check>", "eval"), namespace) if last else None
+    except CheckTimeout:
+        return "timeout", f"no result after {timeout}s"
+    except Exception as exc:
+        return "raised", type(exc).__name__
+    finally:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return "value", value if isinstance(value, str) else repr(value)
+
+
+def run_batch(tasks, timeout):
+    """Worker entry point: run_check over a list of snippets"""
+    return [run_check(code, timeout) for code in tasks]
+
+
+def collect(bank, samples, rng):
+    """(checked questions, number without a check) for a bank; templates are sampled"""
+    questions = []
+    unchecked = 0
+    for qid in range(len(bank)):
+        record = bank.get(qid)
+        if isinstance(record, QuestionTemplate):
+            if record.check is None:
+                unchecked += 1
+                continue
+            variants = range(record.variants)
+            if record.variants > samples:
+                variants = sorted(rng.sample(variants, samples))
+            questions.extend(record.render(variant) for variant in variants)
+        elif record.check is None:
+            unchecked += 1
+        else:
+            questions.append(record)
+    return questions, unchecked
+
+
+def verify(questions, workers=None, timeout=1.0, memory_mb=256):
+    """Run every question's check; return a list of (question, kind, got) failures"""
+    workers = workers or os.cpu_count() or 1
+    # A few batches per worker keeps them all busy without per-snippet overhead
+    size = max(1, -(-len(questions) // (workers * 4)))
+    batches = [[q.check for q in questions[i:i + size]] for i in range(0, len(questions), size)]
+    failures = []
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(memory_mb,)) as pool:
+        results = (result for batch in pool.map(run_batch, batches, [timeout] * len(batches))
+                   for result in batch)
+        for question, (kind, got) in zip(questions, results):
+            if kind in ("value", "raised") and normalize_answer(got) in question.accepted:
+                continue
+            failures.append((question, kind, got))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check every answer key by running its snippet")
+    parser.add_argument("--pack", help="verify a JSONL question pack instead of the built-in bank")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--timeout", type=float, default=1.0, help="seconds per snippet (default 1)")
+    parser.add_argument("--memory-mb", type=int, default=256, help="memory limit per worker (default 256)")
+    parser.add_argument("--samples", type=int, default=20,
+                        help="variants checked per question template (default 20)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for picking template variants")
+    args = parser.parse_args(argv)
+
+    if args.pack:
+        from pcep_packs import PackBank
+        bank = PackBank(args.pack)
+    else:
+        bank = QUESTION_BANK
+    questions, unchecked = collect(bank, args.samples, random.Random(args.seed))
+    failures = verify(questions, args.workers, args.timeout, args.memory_mb)
+
+    for question, kind, got in failures:
+        category = bank.categories[question.category]
+        print(f"qid {question.qid} [{category}] {question.question.splitlines()[0]}")
+        print(f"  expected {question.answer!r}, {kind} {got!r}")
+    print(f"\nChecked {len(questions)} questions: {len(questions) - len(failures)} ok, "
+          f"{len(failures)} failed, {unchecked} without a check.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())